@@ -0,0 +1,117 @@
+"""
+Event page extraction benchmark over the saved pages in benchmarks/fixtures.
+
+Compares the previous approach (BeautifulSoup with html.parser, get_text() once per field,
+patterns compiled on every call) with core.event_extraction.extract_page_details, and checks
+the new extractor's output against EXPECTED (exit status 1 on a mismatch).
+
+The legacy extractor disagrees on two fixtures, and EXPECTED is right both times: it glues
+adjacent cells together ("Date2025-04-19" hides the date, "2025334 Station Road") and lets the
+location pattern run across elements.
+
+    python -m benchmarks.bench_event_extraction [--rounds 50]
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from core.event_extraction import extract_page_details, extract_stall_info
+
+FIXTURES = Path(__file__).parent / "fixtures"
+CONTENT = "Pune street food festival, vendor registration open for food stalls 2025"
+
+EXPECTED = {
+    "event_listing.html": {
+        "phone": None,
+        "date": "February 13, 2025",
+        "location": "334 Station Road",
+        "stall_info": "Vendor registration open - apply via website",
+    },
+    "event_script_heavy.html": {
+        "phone": "(020) 555-0199",
+        "date": "2025-04-19",
+        "location": "Pune",
+        "stall_info": "Vendor registration open - apply via website",
+    },
+    "event_single.html": {
+        "phone": "020-555-0142",
+        "date": "March 14th, 2025",
+        "location": "Shivaji Nagar Grounds, Pune",
+        "stall_info": "Vendor registration open - apply via website",
+    },
+}
+
+
+def legacy_location(content: str, full_text: str) -> str:
+    text = content + " " + full_text
+    for pattern in [
+        r'\b\d+\s+[\w\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Circle|Cir)\b',
+        r'\b[\w\s]+,\s*[A-Z]{2}\s*\d{5}\b',
+        r'\b[\w\s]+,\s*(?:Mumbai|Delhi|Bangalore|Chennai|Kolkata|Pune|Hyderabad|Ahmedabad|Jaipur|Lucknow)\b',
+        r'\b(?:Mumbai|Delhi|Bangalore|Chennai|Kolkata|Pune|Hyderabad|Ahmedabad|Jaipur|Lucknow)\b',
+    ]:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            return match.group(0)
+    return "Location details on website"
+
+
+def legacy_extract(html: bytes, content: str) -> dict:
+    soup = BeautifulSoup(html, 'html.parser')
+    phone_matches = re.findall(r'(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})', soup.get_text())
+    date = "Check website for dates"
+    for pattern in [
+        r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}',
+        r'\b\d{1,2}/\d{1,2}/\d{4}',
+        r'\b\d{1,2}-\d{1,2}-\d{4}',
+        r'\b\d{4}-\d{2}-\d{2}',
+    ]:
+        match = re.search(pattern, soup.get_text(), re.IGNORECASE)
+        if match:
+            date = match.group(0)
+            break
+    return {
+        'phone': phone_matches[0] if phone_matches else None,
+        'date': date,
+        'location': legacy_location(content, soup.get_text()),
+        'stall_info': extract_stall_info(soup.get_text(), content),
+    }
+
+
+def bench(fn, html: bytes, rounds: int) -> float:
+    fn(html, CONTENT)  # warm-up
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(html, CONTENT)
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    mismatches = 0
+    print(f"{'fixture':<28}{'bytes':>9}{'legacy ms':>12}{'new ms':>10}{'speedup':>9}")
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_bytes()
+        old = bench(legacy_extract, html, args.rounds)
+        new = bench(extract_page_details, html, args.rounds)
+        print(f"{path.name:<28}{len(html):>9}{old:>12.2f}{new:>10.2f}{old / new:>8.1f}x")
+        result = extract_page_details(html, CONTENT)
+        print(f"  -> {result['date']} | {result['phone']} | {result['location']} | {result['stall_info']}")
+        expected = EXPECTED.get(path.name)
+        if result != expected:
+            mismatches += 1
+            print(f"  !! expected {expected}")
+    if mismatches:
+        print(f"{mismatches} fixture(s) did not match EXPECTED")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+import redis
+import redis.asyncio as aioredis
+from fastapi import Cookie, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.cache import TTLCache, redis_cache_url
+from core.config import settings
+from db.database import get_async_db
+from models.vendor import Vendor
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class VendorSnapshot:
+    '''
+    Read-only copy of the authenticated vendor's row. It is detached from any DB session,
+    so it can be cached and shared across requests; load the Vendor row to modify it.
+    '''
+    id: int
+    Name: str
+    PhoneNumber: str
+    Location: str
+    BusinessInfo: str
+    session_id: Optional[str]
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_vendor(cls, vendor: Vendor) -> "VendorSnapshot":
+        return cls(
+            id=vendor.id,
+            Name=vendor.Name,
+            PhoneNumber=vendor.PhoneNumber,
+            Location=vendor.Location,
+            BusinessInfo=vendor.BusinessInfo,
+            session_id=vendor.session_id,
+            created_at=vendor.created_at,
+        )
+
+
+# session_id -> VendorSnapshot. Entries are dropped explicitly when a vendor logs in again or
+# is updated. With Redis configured the invalidation is published to every process (see
+# listen_for_invalidations); without it, the TTL bounds staleness in other worker processes.
+vendor_sessions = TTLCache(
+    max_entries=settings.SESSION_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.SESSION_CACHE_TTL_SECONDS,
+)
+
+SESSION_INVALIDATION_CHANNEL = "vendor-sessions:invalidate"
+
+# Bumped on every invalidation, so a lookup that raced one doesn't cache what it read
+_invalidations = 0
+_publisher: Optional[redis.Redis] = None
+
+
+def get_session_id(session_id: Optional[str] = Cookie(None)):
+    if not session_id:
+        session_id = str(uuid.uuid4())
+    return session_id
+
+
+async def get_current_vendor(session_id: Optional[str] = Cookie(None), db: AsyncSession = Depends(get_async_db)) -> VendorSnapshot:
+    """Resolve the session cookie to the logged-in vendor, hitting the database only on a cache miss."""
+    if not session_id:
+        raise HTTPException(status_code=401, detail="Vendor not authenticated")
+
+    snapshot = vendor_sessions.get(session_id)
+    if snapshot is not None:
+        return snapshot
+
+    seen = _invalidations
+    vendor = (await db.scalars(select(Vendor).where(Vendor.session_id == session_id).limit(1))).first()
+    if not vendor:
+        raise HTTPException(status_code=401, detail="Vendor not authenticated")
+    snapshot = VendorSnapshot.from_vendor(vendor)
+    if seen == _invalidations:
+        vendor_sessions.set(session_id, snapshot)
+    return snapshot
+
+
+def _forget_vendor(vendor_id: int) -> None:
+    global _invalidations
+    _invalidations += 1
+    vendor_sessions.delete_where(lambda snapshot: snapshot.id == vendor_id)
+
+
+def invalidate_vendor(vendor_id: int) -> None:
+    """
+    Forget every cached session of a vendor in this process and tell the other processes to do
+    the same; call after committing a change to its row or session_id. Runs in the sync routes'
+    threadpool, so it publishes with the blocking client.
+    """
+    global _publisher
+    _forget_vendor(vendor_id)
+    url = redis_cache_url()
+    if not url:
+        return
+    try:
+        if _publisher is None:
+            _publisher = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        _publisher.publish(SESSION_INVALIDATION_CHANNEL, str(vendor_id))
+    except Exception as e:
+        logger.warning(f"Session invalidation for vendor {vendor_id} not published, other processes rely on the TTL: {e}")
+
+
+async def listen_for_invalidations(retry_seconds: float = 5.0) -> None:
+    """
+    Drop cached sessions as other processes invalidate them. Runs for the life of the app
+    (started in main.py) and reconnects when Redis goes away.
+    """
+    url = redis_cache_url()
+    if not url:
+        return
+    while True:
+        client = aioredis.from_url(url)
+        try:
+            async with client.pubsub() as pubsub:
+                await pubsub.subscribe(SESSION_INVALIDATION_CHANNEL)
+                # Messages sent while we weren't subscribed are lost, so start from an empty cache
+                vendor_sessions.clear()
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _forget_vendor(int(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Session invalidation listener lost Redis, retrying in {retry_seconds}s: {e}")
+        finally:
+            await client.aclose()
+        await asyncio.sleep(retry_seconds)
@@ -0,0 +1,154 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import redis.asyncio as aioredis
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TTLCache:
+    '''
+    Small thread-safe in-process cache with LRU eviction and a per-entry time to live.
+    '''
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Drop every entry whose value matches; O(n), meant for rare invalidations."""
+        with self._lock:
+            keys = [key for key, (_, value) in self._data.items() if predicate(value)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class TieredCache:
+    '''
+    JSON value cache with an in-process TTLCache in front of Redis.
+    Redis is optional: without a URL, or while it is unreachable, the in-process tier keeps serving.
+    Redis entries expire through their TTL; the overall size is bounded by the server's maxmemory policy.
+    '''
+
+    def __init__(self, namespace: str, ttl_seconds: float, max_entries: int, redis_url: str = ""):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.local = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.redis_url = redis_url
+        self._redis: Optional[aioredis.Redis] = None
+        self.stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "errors": 0}
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _client(self) -> Optional[aioredis.Redis]:
+        if not self.redis_url:
+            return None
+        if self._redis is None:
+            self._redis = aioredis.from_url(self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._redis
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            self.stats["l1_hits"] += 1
+            return value
+
+        client = self._client()
+        if client is not None:
+            try:
+                raw = await client.get(self._key(key))
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Cache '{self.namespace}' read failed, using in-process tier only: {e}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw)
+                self.local.set(key, value)
+                self.stats["l2_hits"] += 1
+                return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        self.local.set(key, value)
+        client = self._client()
+        if client is None:
+            return
+        try:
+            await client.set(self._key(key), json.dumps(value), ex=int(self.ttl_seconds))
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Cache '{self.namespace}' write failed: {e}")
+
+    async def delete(self, key: str) -> None:
+        self.local.delete(key)
+        client = self._client()
+        if client is None:
+            return
+        try:
+            await client.delete(self._key(key))
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Cache '{self.namespace}' delete failed: {e}")
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["l1_hits"] + self.stats["l2_hits"] + self.stats["misses"]
+        hits = self.stats["l1_hits"] + self.stats["l2_hits"]
+        return {
+            "namespace": self.namespace,
+            **self.stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "l1_entries": len(self.local),
+            "redis": bool(self.redis_url),
+        }
+
+
+def redis_cache_url() -> str:
+    """CACHE_REDIS_URL, or the Celery broker when that is a Redis instance."""
+    if settings.CACHE_REDIS_URL:
+        return settings.CACHE_REDIS_URL
+    if settings.CELERY_BROKER_URL.startswith(("redis://", "rediss://")):
+        return settings.CELERY_BROKER_URL
+    return ""
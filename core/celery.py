@@ -1,8 +1,9 @@
+import asyncio
+import redis.asyncio as aioredis
 from celery import Celery
+from celery.signals import worker_process_init
 from models.remainder import Remind_Me
 from twilio.rest import Client
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
 from datetime import datetime
 import pytz
 import traceback
@@ -10,6 +11,15 @@ import models.remainder
 import models.vendor
 
 from core.config import settings
+from core.etag import REMINDERS, bump_version
+from core.cache import redis_cache_url
+from core.ingest import load_staged_image
+from db.database import SessionLocal, dispose_engines
+from db.ledger import insert_ledger_rows
+from core.receipts import (
+    ReceiptError, extract_receipt, remember_receipt,
+    parse_receipt_payload, validate_items, build_row, record_to_item
+)
 # from models.remainder import Remind_Me
 
 celery_app = Celery(
@@ -18,11 +28,73 @@ celery_app = Celery(
     backend=settings.CELERY_RESULT_BACKEND
 )
 
-# DB setup (reuse)
-engine = create_engine(settings.DATABASE_URL, echo=False, future=True)
-SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+# The web tier's engine profile (db.database); each forked worker process opens its own connections
+@worker_process_init.connect
+def reset_db_pool(**kwargs):
+    dispose_engines()
 # celery.py
 
+# One event loop per worker process, so the pooled async clients (Groq, Redis) stay bound to it across tasks.
+_worker_loop = None
+
+
+def run_async(coro):
+    global _worker_loop
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+    return _worker_loop.run_until_complete(coro)
+
+
+# Staged receipt images (core.ingest.stage_image), read on the worker loop above
+_image_store = None
+
+
+def _image_store_client():
+    global _image_store
+    if _image_store is None:
+        _image_store = aioredis.from_url(redis_cache_url())
+    return _image_store
+
+
+@celery_app.task(bind=True, name="process_receipt_job")
+def process_receipt_job(self, vendor_id, intent, staged):
+    """
+    Extract a receipt and insert its items for the vendor. staged is what core.ingest.stage_image
+    returned: the image's metadata, with the data URL itself waiting in Redis under its digest.
+    Progress is published as PROGRESS state; the return value is the job's final status.
+    """
+    self.update_state(state="PROGRESS", meta={"stage": "extracting"})
+    try:
+        image = run_async(load_staged_image(_image_store_client(), staged))
+        raw, cached = run_async(extract_receipt(image, intent))
+        items = validate_items(parse_receipt_payload(raw, intent))
+    except ReceiptError as e:
+        return {"status": "failed", "status_code": e.status_code, "error": e.detail}
+
+    self.update_state(state="PROGRESS", meta={"stage": "saving", "count": len(items)})
+    db = SessionLocal()
+    try:
+        records = insert_ledger_rows(db, intent, [build_row(intent, item, vendor_id) for item in items])
+        db.commit()
+        response_items = [record_to_item(intent, record) for record in records]
+    except Exception as e:
+        db.rollback()
+        traceback.print_exc()
+        return {"status": "failed", "status_code": 500, "error": f"Database error: {str(e)}"}
+    finally:
+        db.close()
+
+    if not cached:
+        run_async(remember_receipt(image, intent, raw))
+    return {
+        "status": "done",
+        "items": response_items,
+        "count": len(response_items),
+        "cached": cached,
+        "preprocessing": image.preprocessing,
+    }
+
+
 
 @celery_app.task
 def send_whatsapp_reminder(vendor_phone, supplier_name, supplier_phone, amount, item_name, payment_method, reminder_id):
@@ -50,6 +122,7 @@ def send_whatsapp_reminder(vendor_phone, supplier_name, supplier_phone, amount,
         reminder = db.query(Remind_Me).filter(Remind_Me.id == reminder_id).first()
         if reminder:
             reminder.status = "sent"
+            bump_version(db, [reminder.vendor_id], REMINDERS)
             db.commit()
         else:
             print(f"[ERROR] Reminder ID {reminder_id} not found in database")
@@ -60,6 +133,7 @@ def send_whatsapp_reminder(vendor_phone, supplier_name, supplier_phone, amount,
         reminder = db.query(Remind_Me).filter(Remind_Me.id == reminder_id).first()
         if reminder:
             reminder.status = "failed"
+            bump_version(db, [reminder.vendor_id], REMINDERS)
             db.commit()
         return {"status": "failed", "error": str(e)}
     finally:
@@ -7,6 +7,15 @@ class Settings(BaseSettings):
     API_PREFIX:str = "/api"
     DEBUG: bool = False
     DATABASE_URL: str = Field(default="", validation_alias="DATABASE_URL")
+    DATABASE_READ_URL: str = Field(default="", validation_alias="DATABASE_READ_URL")
+    DB_POOL_SIZE: int = Field(default=5, validation_alias="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(default=10, validation_alias="DB_MAX_OVERFLOW")
+    DB_POOL_TIMEOUT_SECONDS: float = Field(default=30.0, validation_alias="DB_POOL_TIMEOUT_SECONDS")
+    DB_POOL_RECYCLE_SECONDS: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE_SECONDS")
+    DB_POOL_PRE_PING: bool = Field(default=True, validation_alias="DB_POOL_PRE_PING")
+    SQLITE_JOURNAL_MODE: str = Field(default="WAL", validation_alias="SQLITE_JOURNAL_MODE")
+    SQLITE_SYNCHRONOUS: str = Field(default="NORMAL", validation_alias="SQLITE_SYNCHRONOUS")
+    SQLITE_BUSY_TIMEOUT_MS: int = Field(default=5000, validation_alias="SQLITE_BUSY_TIMEOUT_MS")
     ALLOWED_ORIGINS: str = ""
     OPENAI_API_KEY: str = Field(default="", validation_alias="OPENAI_API_KEY")
     TWILIO_SID: str = Field(default="", validation_alias="TWILIO_SID")
@@ -16,6 +25,54 @@ class Settings(BaseSettings):
     PHONE_NUMBER: str = Field(default="",validation_alias="PHONE_NUMBER")
     TIMEZONE:str = Field(default="UTC", validation_alias="TIMEZONE")
     GROQ_API_KEY:str = Field(default="", validation_alias="GROQ_API_KEY")
+    VISION_PROVIDER: str = Field(default="groq", validation_alias="VISION_PROVIDER")
+    VISION_MODEL: str = Field(default="meta-llama/llama-4-maverick-17b-128e-instruct", validation_alias="VISION_MODEL")
+    VISION_MAX_CONCURRENCY: int = Field(default=8, validation_alias="VISION_MAX_CONCURRENCY")
+    VISION_TIMEOUT_SECONDS: float = Field(default=30.0, validation_alias="VISION_TIMEOUT_SECONDS")
+    VISION_DEADLINE_SECONDS: float = Field(default=45.0, validation_alias="VISION_DEADLINE_SECONDS")
+    VISION_MAX_RETRIES: int = Field(default=2, validation_alias="VISION_MAX_RETRIES")
+    VISION_BREAKER_THRESHOLD: int = Field(default=5, validation_alias="VISION_BREAKER_THRESHOLD")
+    VISION_BREAKER_RESET_SECONDS: float = Field(default=30.0, validation_alias="VISION_BREAKER_RESET_SECONDS")
+    VISION_FAKE_LATENCY_MS: int = Field(default=800, validation_alias="VISION_FAKE_LATENCY_MS")
+    RECEIPT_MAX_BYTES: int = Field(default=10 * 1024 * 1024, validation_alias="RECEIPT_MAX_BYTES")
+    RECEIPT_PREPROCESS: bool = Field(default=True, validation_alias="RECEIPT_PREPROCESS")
+    RECEIPT_MAX_EDGE: int = Field(default=1600, validation_alias="RECEIPT_MAX_EDGE")
+    RECEIPT_JPEG_QUALITY: int = Field(default=80, validation_alias="RECEIPT_JPEG_QUALITY")
+    WORKER_PROCESSES: int = Field(default=0, validation_alias="WORKER_PROCESSES")
+    RECEIPT_BATCH_CONCURRENCY: int = Field(default=4, validation_alias="RECEIPT_BATCH_CONCURRENCY")
+    RECEIPT_BATCH_MAX_FILES: int = Field(default=30, validation_alias="RECEIPT_BATCH_MAX_FILES")
+    RECEIPT_JOB_TTL_SECONDS: int = Field(default=86400, validation_alias="RECEIPT_JOB_TTL_SECONDS")
+    RECEIPT_JOB_POLL_SECONDS: float = Field(default=1.0, validation_alias="RECEIPT_JOB_POLL_SECONDS")
+    RECEIPT_JOB_STREAM_SECONDS: int = Field(default=300, validation_alias="RECEIPT_JOB_STREAM_SECONDS")
+    RECEIPT_JOB_IMAGE_TTL_SECONDS: int = Field(default=3600, validation_alias="RECEIPT_JOB_IMAGE_TTL_SECONDS")
+    SESSION_CACHE_TTL_SECONDS: int = Field(default=60, validation_alias="SESSION_CACHE_TTL_SECONDS")
+    SESSION_CACHE_MAX_ENTRIES: int = Field(default=10000, validation_alias="SESSION_CACHE_MAX_ENTRIES")
+    CACHE_REDIS_URL: str = Field(default="", validation_alias="CACHE_REDIS_URL")
+    RECEIPT_CACHE_TTL_SECONDS: int = Field(default=86400, validation_alias="RECEIPT_CACHE_TTL_SECONDS")
+    RECEIPT_CACHE_MAX_ENTRIES: int = Field(default=512, validation_alias="RECEIPT_CACHE_MAX_ENTRIES")
+    LEDGER_BULK_MAX_ROWS: int = Field(default=1000, validation_alias="LEDGER_BULK_MAX_ROWS")
+    LEDGER_IMPORT_CHUNK_SIZE: int = Field(default=1000, validation_alias="LEDGER_IMPORT_CHUNK_SIZE")
+    TAVILY_API_KEY: str = Field(default="", validation_alias="TAVILY_API_KEY")
+    EVENT_SEARCH_CONCURRENCY: int = Field(default=4, validation_alias="EVENT_SEARCH_CONCURRENCY")
+    EVENT_SEARCH_RATE_PER_SECOND: float = Field(default=2.0, validation_alias="EVENT_SEARCH_RATE_PER_SECOND")
+    EVENT_SEARCH_BURST: int = Field(default=4, validation_alias="EVENT_SEARCH_BURST")
+    EVENT_DISCOVERY_DEADLINE_SECONDS: float = Field(default=20.0, validation_alias="EVENT_DISCOVERY_DEADLINE_SECONDS")
+    EVENT_SEARCH_CACHE_TTL_SECONDS: int = Field(default=21600, validation_alias="EVENT_SEARCH_CACHE_TTL_SECONDS")
+    EVENT_SEARCH_CACHE_MAX_ENTRIES: int = Field(default=2048, validation_alias="EVENT_SEARCH_CACHE_MAX_ENTRIES")
+    EVENT_CITY_REFRESH_SECONDS: int = Field(default=21600, validation_alias="EVENT_CITY_REFRESH_SECONDS")
+    EVENT_CITY_MAX_EVENTS: int = Field(default=50, validation_alias="EVENT_CITY_MAX_EVENTS")
+    EVENT_CITY_RADIUS_KM: int = Field(default=50, validation_alias="EVENT_CITY_RADIUS_KM")
+    FETCH_MAX_CONNECTIONS: int = Field(default=32, validation_alias="FETCH_MAX_CONNECTIONS")
+    FETCH_MAX_CONNECTIONS_PER_HOST: int = Field(default=4, validation_alias="FETCH_MAX_CONNECTIONS_PER_HOST")
+    FETCH_TIMEOUT_SECONDS: float = Field(default=8.0, validation_alias="FETCH_TIMEOUT_SECONDS")
+    FETCH_MAX_BYTES: int = Field(default=2 * 1024 * 1024, validation_alias="FETCH_MAX_BYTES")
+    FETCH_KEEPALIVE_SECONDS: float = Field(default=30.0, validation_alias="FETCH_KEEPALIVE_SECONDS")
+    FETCH_USER_AGENT: str = Field(default="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36", validation_alias="FETCH_USER_AGENT")
+    PAGE_CACHE_ENABLED: bool = Field(default=True, validation_alias="PAGE_CACHE_ENABLED")
+    PAGE_CACHE_DIR: str = Field(default=".cache/pages", validation_alias="PAGE_CACHE_DIR")
+    PAGE_CACHE_MAX_BYTES: int = Field(default=256 * 1024 * 1024, validation_alias="PAGE_CACHE_MAX_BYTES")
+    PAGE_CACHE_DEFAULT_TTL_SECONDS: int = Field(default=3600, validation_alias="PAGE_CACHE_DEFAULT_TTL_SECONDS")
+    PAGE_CACHE_NEGATIVE_TTL_SECONDS: int = Field(default=300, validation_alias="PAGE_CACHE_NEGATIVE_TTL_SECONDS")
     
     @field_validator("ALLOWED_ORIGINS")
     def parse_allowed_origins(cls, v: str) -> List[str]:
@@ -0,0 +1,73 @@
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy.orm import Session
+
+from db.upsert import upsert_rows
+from models.collection_version import CollectionVersion
+
+PURCHASES = "purchases"
+SALES = "sales"
+REMINDERS = "reminders"
+VENDOR_EVENTS = "vendor-events"
+
+# Ledger kind -> collection
+LEDGER_COLLECTIONS = {
+    'purchase': PURCHASES,
+    'selling': SALES,
+}
+
+
+def bump_version(db: Session, vendor_ids: Iterable[int], collection: str) -> None:
+    """Mark a collection as changed for these vendors. Call it in the write's transaction, before commit."""
+    upsert_rows(
+        db, CollectionVersion,
+        [{"vendor_id": vendor_id, "collection": collection, "version": 1} for vendor_id in set(vendor_ids)],
+        conflict_cols=("vendor_id", "collection"),
+        increment_cols=("version",),
+    )
+
+
+def get_version(db: Session, vendor_id: int, collection: str) -> int:
+    version = (
+        db.query(CollectionVersion.version)
+        .filter(CollectionVersion.vendor_id == vendor_id, CollectionVersion.collection == collection)
+        .scalar()
+    )
+    return version or 0
+
+
+def make_etag(request: Request, vendor_id: int, collection: str, version: int, variant: str = "") -> str:
+    # Weak: the same version renders to equivalent, not byte-identical, JSON. The query string is
+    # part of the tag because pages and filters of one collection are different representations.
+    # `variant` covers inputs other than writes that change the list, e.g. the date for "upcoming" filters.
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    if variant:
+        query += f"|{variant}"
+    digest = hashlib.sha1(query.encode()).hexdigest()[:12]
+    return f'W/"{collection}-{vendor_id}-{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: W/ prefixes are ignored
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def not_modified(request: Request, response: Response, db: Session, vendor_id: int, collection: str,
+                 variant: str = "") -> Optional[Response]:
+    """
+    Set the ETag for a vendor's list endpoint on `response`; when the client's If-None-Match
+    still matches, return the 304 to send instead of running the list query.
+    """
+    etag = make_etag(request, vendor_id, collection, get_version(db, vendor_id, collection), variant)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
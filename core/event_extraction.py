@@ -0,0 +1,125 @@
+import re
+from datetime import datetime
+
+import lxml.html
+from lxml import etree
+
+# Event page extraction. Everything here is plain top-level functions over bytes/str so the
+# whole page can be handed to the worker pool (see core.workers.run_in_process) in one call.
+
+DEFAULT_DATE = "Check website for dates"
+DEFAULT_LOCATION = "Location details on website"
+
+_CITIES = r'(?:Mumbai|Delhi|Bangalore|Chennai|Kolkata|Pune|Hyderabad|Ahmedabad|Jaipur|Lucknow)'
+
+# Patterns match whitespace with [ \t], never \s: visible_text puts every text node on its own
+# line, so a match can't be stitched together out of separate elements (a date cell and the
+# venue cell after it, a nav bar and the heading below it).
+
+PHONE_RE = re.compile(r'(\(?\d{3}\)?[-. \t]?\d{3}[-. \t]?\d{4})')
+
+DATE_PATTERNS = [
+    re.compile(
+        r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)'
+        r'[ \t]+\d{1,2}(?:st|nd|rd|th)?,?[ \t]+\d{4}',
+        re.IGNORECASE,
+    ),
+    re.compile(r'\b\d{1,2}/\d{1,2}/\d{4}'),
+    re.compile(r'\b\d{1,2}-\d{1,2}-\d{4}'),
+    re.compile(r'\b\d{4}-\d{2}-\d{2}'),  # ISO date format
+]
+
+LOCATION_PATTERNS = [
+    re.compile(r'\b\d+[ \t]+[\w \t]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Circle|Cir)\b', re.IGNORECASE),
+    re.compile(r'\b[\w \t]+,[ \t]*[A-Z]{2}[ \t]*\d{5}\b', re.IGNORECASE),
+    re.compile(r'\b[\w \t]+,[ \t]*' + _CITIES + r'\b', re.IGNORECASE),
+    re.compile(r'\b' + _CITIES + r'\b', re.IGNORECASE),
+]
+
+# Elements whose text never shows up on the rendered page
+_INVISIBLE = ("script", "style", "noscript", "template", etree.Comment, etree.ProcessingInstruction)
+
+
+def visible_text(html: bytes) -> str:
+    """
+    Rendered text of an HTML document, one text node per line with its whitespace collapsed.
+    Keeping node boundaries means words from adjacent elements ("Date</td><td>2025-04-19")
+    neither run together nor get matched as one phrase.
+    """
+    if not html or not html.strip():
+        return ""
+    try:
+        root = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return ""
+    etree.strip_elements(root, *_INVISIBLE, with_tail=False)
+    lines = (" ".join(node.split()) for node in root.itertext())
+    return "\n".join(line for line in lines if line)
+
+
+def extract_phone(text: str):
+    match = PHONE_RE.search(text)
+    return match.group(1) if match else None
+
+
+def extract_date(text: str) -> str:
+    for pattern in DATE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(0)
+    return DEFAULT_DATE
+
+
+def extract_location(content: str, full_text: str = "") -> str:
+    text = content + "\n" + full_text
+    for pattern in LOCATION_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return match.group(0)
+    return DEFAULT_LOCATION
+
+
+def extract_stall_info(full_text: str, content: str) -> str:
+    text = (full_text + " " + content).lower()
+    if 'vendor' in text and 'registration' in text:
+        return "Vendor registration open - apply via website"
+    elif 'stall' in text and 'booking' in text:
+        return "Stall booking required - contact organizer"
+    elif 'food' in text and 'vendor' in text:
+        return "Food vendors welcome - check website for details"
+    elif any(word in text for word in ['₹', 'rs.', 'fee', 'cost']):
+        return "Vendor fees apply - see website for pricing"
+    else:
+        return "Contact event organizer for vendor opportunities"
+
+
+def extract_page_details(html: bytes, content: str) -> dict:
+    """Parse a page once and pull phone, date, location and stall info out of its visible text."""
+    text = visible_text(html)
+    return {
+        'phone': extract_phone(text),
+        'date': extract_date(text),
+        'location': extract_location(content, text),
+        'stall_info': extract_stall_info(text, content),
+    }
+
+
+_DAY_FORMATS = (
+    "%Y-%m-%d",
+    "%B %d, %Y", "%B %d %Y",
+    "%d/%m/%Y", "%d-%m-%Y",  # day first, as Indian listings write them
+)
+_ORDINAL = re.compile(r'(\d)(?:st|nd|rd|th)\b', re.IGNORECASE)
+
+
+def parse_event_day(text):
+    """The calendar day of an extracted date string, or None when it isn't one (e.g. DEFAULT_DATE)."""
+    if not text:
+        return None
+    cleaned = " ".join(_ORDINAL.sub(r'\1', text).split())
+    for fmt in _DAY_FORMATS:
+        try:
+            return datetime.strptime(cleaned, fmt).date()
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,153 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from core.config import settings
+from core.page_cache import PageCache
+
+
+class FetchError(Exception):
+    '''Raised when a page cannot be fetched: connection failures, timeouts and non-2xx answers.'''
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class HttpFetcher:
+    '''
+    Pooled async HTTP client for pulling web pages (event listings and the like).
+    One aiohttp session per process keeps connections alive between requests; the connector
+    caps connections overall and per host, and bodies are streamed and cut off at `max_bytes`.
+    '''
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, *, limit: int, limit_per_host: int, timeout: float, max_bytes: int,
+                 keepalive_seconds: float, user_agent: str, cache: Optional[PageCache] = None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.keepalive_seconds = keepalive_seconds
+        self.user_agent = user_agent
+        self.cache = cache
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily so it binds to the running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_seconds,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"User-Agent": self.user_agent},
+            )
+        return self._session
+
+    async def _get(self, url: str, headers: Optional[dict] = None):
+        """GET a URL; returns (status, response headers, body) with the body streamed and capped."""
+        try:
+            async with self._get_session().get(url, headers=headers) as response:
+                if response.status >= 300:
+                    return response.status, response.headers, b""
+                body = bytearray()
+                async for chunk in response.content.iter_chunked(self.CHUNK_SIZE):
+                    body.extend(chunk)
+                    if len(body) >= self.max_bytes:
+                        del body[self.max_bytes:]
+                        break
+                return response.status, response.headers, bytes(body)
+        except asyncio.TimeoutError:
+            raise FetchError(f"GET {url} timed out after {self.timeout}s")
+        except aiohttp.ClientError as e:
+            raise FetchError(f"GET {url} failed: {type(e).__name__}: {e}")
+
+    async def fetch(self, url: str) -> bytes:
+        """
+        GET a URL and return its body. Bodies larger than max_bytes are truncated rather
+        than rejected: the first part of a page is still useful for text extraction.
+        With a page cache, fresh copies are served without a request, stale ones are
+        revalidated with If-None-Match / If-Modified-Since, and recent failures fail fast.
+        """
+        cached = await self.cache.get(url) if self.cache else None
+        if cached and cached.fresh:
+            self.cache.hits += 1
+            if cached.negative:
+                raise FetchError(f"GET {url} failed recently (cached)", status=cached.status or None)
+            return cached.body
+        if self.cache:
+            self.cache.misses += 1
+
+        headers = {}
+        if cached and cached.revalidatable:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        try:
+            status, response_headers, body = await self._get(url, headers)
+        except FetchError:
+            # A stale copy beats no page; only remember the failure when there is nothing to fall back on
+            if cached and not cached.negative:
+                return cached.body
+            if self.cache:
+                await self.cache.store_failure(url)
+            raise
+
+        if status == 304 and cached and cached.revalidatable:
+            await self.cache.revalidated(url, response_headers)
+            return cached.body
+        if status >= 300:
+            # 4xx are the page's own answer and worth remembering; 5xx may be gone on the next try
+            if self.cache and 400 <= status < 500:
+                await self.cache.store_failure(url, status)
+            raise FetchError(f"GET {url} answered {status}", status=status)
+        if self.cache:
+            await self.cache.store(url, body, response_headers)
+        return body
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+
+
+_fetcher: Optional[HttpFetcher] = None
+
+
+def get_http_fetcher() -> HttpFetcher:
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = HttpFetcher(
+            limit=settings.FETCH_MAX_CONNECTIONS,
+            limit_per_host=settings.FETCH_MAX_CONNECTIONS_PER_HOST,
+            timeout=settings.FETCH_TIMEOUT_SECONDS,
+            max_bytes=settings.FETCH_MAX_BYTES,
+            keepalive_seconds=settings.FETCH_KEEPALIVE_SECONDS,
+            user_agent=settings.FETCH_USER_AGENT,
+            cache=PageCache(
+                settings.PAGE_CACHE_DIR,
+                max_bytes=settings.PAGE_CACHE_MAX_BYTES,
+                default_ttl=settings.PAGE_CACHE_DEFAULT_TTL_SECONDS,
+                negative_ttl=settings.PAGE_CACHE_NEGATIVE_TTL_SECONDS,
+            ) if settings.PAGE_CACHE_ENABLED else None,
+        )
+    return _fetcher
+
+
+async def close_http_fetcher() -> None:
+    global _fetcher
+    if _fetcher is not None:
+        await _fetcher.close()
+        _fetcher = None
@@ -0,0 +1,62 @@
+import io
+
+from PIL import Image, ImageOps
+
+# Fraction of the frame the bright "paper" region must cover before we trust the crop.
+MIN_PAPER_FRACTION = 0.2
+PAPER_MARGIN = 0.02
+
+
+def _paper_bbox(gray: Image.Image) -> tuple:
+    """Bounding box of the bright receipt paper, or the full frame when it can't be told apart."""
+    probe = gray.copy()
+    probe.thumbnail((256, 256))
+    probe = ImageOps.autocontrast(probe, cutoff=2).point(lambda p: 255 if p > 160 else 0)
+    bbox = probe.getbbox()
+    if not bbox:
+        return (0, 0, gray.width, gray.height)
+
+    left, top, right, bottom = bbox
+    if (right - left) * (bottom - top) < MIN_PAPER_FRACTION * probe.width * probe.height:
+        return (0, 0, gray.width, gray.height)
+
+    sx, sy = gray.width / probe.width, gray.height / probe.height
+    mx, my = gray.width * PAPER_MARGIN, gray.height * PAPER_MARGIN
+    return (
+        max(0, int(left * sx - mx)),
+        max(0, int(top * sy - my)),
+        min(gray.width, int(right * sx + mx)),
+        min(gray.height, int(bottom * sy + my)),
+    )
+
+
+def preprocess_receipt(data: bytes, max_edge: int, quality: int) -> tuple:
+    """
+    Auto-orient, grayscale, crop to the paper, downscale to max_edge and re-encode as JPEG.
+    Returns (jpeg_bytes, stats). Runs in the worker pool (see core.workers), so it must stay
+    a picklable top-level function. If the result would not be smaller, the original is kept.
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        # Let the JPEG decoder scale down while decoding instead of inflating the full 12 MP frame
+        img.draft("L", (max_edge, max_edge))
+        img = ImageOps.exif_transpose(img)
+        gray = img.convert("L")
+
+    gray = gray.crop(_paper_bbox(gray))
+    gray.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+    out = io.BytesIO()
+    gray.save(out, format="JPEG", quality=quality, optimize=True)
+    processed = out.getvalue()
+
+    stats = {
+        "original_bytes": len(data),
+        "processed_bytes": len(processed),
+        "width": gray.width,
+        "height": gray.height,
+    }
+    if len(processed) >= len(data):
+        stats.update(processed_bytes=len(data), bytes_saved=0, applied=False)
+        return data, stats
+    stats.update(bytes_saved=len(data) - len(processed), applied=True)
+    return processed, stats
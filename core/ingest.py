@@ -0,0 +1,176 @@
+import base64
+import hashlib
+import logging
+from dataclasses import dataclass, field, fields
+
+from fastapi import UploadFile
+
+from core.config import settings
+from core.image_preprocess import preprocess_receipt
+from core.receipts import ReceiptError
+from core.workers import run_in_process
+
+logger = logging.getLogger(__name__)
+
+# Multiple of 3 so every chunk base64-encodes without padding and the pieces concatenate cleanly.
+CHUNK_SIZE = 3 * 64 * 1024
+
+
+@dataclass
+class IngestedImage:
+    '''
+    An uploaded receipt image held only as the base64 data URL the vision model is sent, plus the
+    digest of the original bytes. The URL is built once at ingest so no further copies are made.
+    preprocessing carries the byte counts from core.image_preprocess when that stage ran.
+    '''
+    data_url: str
+    sha256: str
+    size: int
+    content_type: str
+    preprocessing: dict = field(default_factory=dict)
+
+
+# Receipt jobs pass the Celery worker a digest instead of the image: the data URL waits in Redis
+STAGED_IMAGE_NAMESPACE = "receipt-image"
+
+
+def _staged_key(sha256: str) -> str:
+    return f"{STAGED_IMAGE_NAMESPACE}:{sha256}"
+
+
+async def stage_image(client, image: IngestedImage) -> dict:
+    """
+    Store the image's data URL in Redis under its digest for RECEIPT_JOB_IMAGE_TTL_SECONDS and
+    return the rest of the image, the small part a job carries. Identical uploads share the entry,
+    so it is left to expire rather than deleted when a job finishes.
+    """
+    await client.set(_staged_key(image.sha256), image.data_url, ex=settings.RECEIPT_JOB_IMAGE_TTL_SECONDS)
+    return {f.name: getattr(image, f.name) for f in fields(IngestedImage) if f.name != "data_url"}
+
+
+async def load_staged_image(client, staged: dict) -> IngestedImage:
+    """Rebuild an IngestedImage from stage_image's return value."""
+    data_url = await client.get(_staged_key(staged["sha256"]))
+    if data_url is None:
+        raise ReceiptError('The receipt image expired before the job ran. Please upload it again.', 410)
+    return IngestedImage(data_url=data_url.decode("ascii"), **staged)
+
+
+def _data_url_prefix(content_type: str) -> str:
+    return f"data:{content_type};base64,"
+
+
+def _encode_data_url(content_type: str, data) -> str:
+    """
+    base64 data URL of `data`, grown with `data_url += piece`. CPython resizes a str nothing else
+    references in place, so this never holds a second full copy the way bytearray + .decode() or
+    "".join(pieces) do. _ingest_streaming builds its URL the same way.
+    """
+    data_url = _data_url_prefix(content_type)
+    view = memoryview(data)
+    for start in range(0, len(view), CHUNK_SIZE):
+        data_url += base64.b64encode(view[start:start + CHUNK_SIZE]).decode("ascii")
+    return data_url
+
+
+def _too_large(max_bytes: int) -> ReceiptError:
+    return ReceiptError(f'File too large. Maximum size is {max_bytes // (1024 * 1024)} MB.', 413)
+
+
+async def ingest_upload(file: UploadFile, max_bytes: int = None, preprocess: bool = None) -> IngestedImage:
+    """
+    Validate an uploaded receipt and turn it into an IngestedImage without touching the
+    working directory. Uploads over max_bytes are refused before (or as soon as) the limit
+    is crossed. With preprocessing on (RECEIPT_PREPROCESS), the image is shrunk in the
+    worker pool before encoding; otherwise it is encoded as it streams in.
+    """
+    max_bytes = max_bytes or settings.RECEIPT_MAX_BYTES
+    preprocess = settings.RECEIPT_PREPROCESS if preprocess is None else preprocess
+    if not file.content_type or not file.content_type.startswith('image/'):
+        raise ReceiptError('Invalid file type. Please upload an image file.')
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)
+
+    if preprocess:
+        return await _ingest_preprocessed(file, max_bytes)
+    return await _ingest_streaming(file, max_bytes)
+
+
+async def _ingest_streaming(file: UploadFile, max_bytes: int) -> IngestedImage:
+    """
+    Hash and base64-encode chunk by chunk straight from Starlette's spooled file,
+    so the raw bytes are never held in full.
+    """
+    hasher = hashlib.sha256()
+    data_url = _data_url_prefix(file.content_type)
+    pending = b""
+    size = 0
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise _too_large(max_bytes)
+        hasher.update(chunk)
+        chunk = pending + chunk
+        cut = len(chunk) - len(chunk) % 3
+        data_url += base64.b64encode(chunk[:cut]).decode("ascii")
+        pending = chunk[cut:]
+    data_url += base64.b64encode(pending).decode("ascii")
+
+    if not size:
+        raise ReceiptError('Empty file uploaded.')
+
+    return IngestedImage(
+        data_url=data_url,
+        sha256=hasher.hexdigest(),
+        size=size,
+        content_type=file.content_type,
+    )
+
+
+async def _ingest_preprocessed(file: UploadFile, max_bytes: int) -> IngestedImage:
+    """
+    Read the raw bytes (the decoder needs them whole), shrink them in the worker pool and
+    encode only the much smaller result. The digest is still taken over the original upload,
+    and the raw buffer is dropped before encoding unless it is what gets encoded.
+    """
+    hasher = hashlib.sha256()
+    data = bytearray()
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        if len(data) + len(chunk) > max_bytes:
+            raise _too_large(max_bytes)
+        hasher.update(chunk)
+        data += chunk
+
+    if not data:
+        raise ReceiptError('Empty file uploaded.')
+
+    content_type = file.content_type
+    size = len(data)
+    try:
+        processed, stats = await run_in_process(
+            preprocess_receipt, data, settings.RECEIPT_MAX_EDGE, settings.RECEIPT_JPEG_QUALITY
+        )
+        if stats["applied"]:
+            content_type = "image/jpeg"
+        logger.info(f"Receipt preprocessing saved {stats['bytes_saved']} of {stats['original_bytes']} bytes")
+    except Exception as e:
+        # Formats Pillow can't decode still go to the model untouched
+        logger.warning(f"Receipt preprocessing skipped: {e}")
+        processed, stats = data, {}
+    del data
+
+    data_url = _encode_data_url(content_type, processed)
+    del processed
+    return IngestedImage(
+        data_url=data_url,
+        sha256=hasher.hexdigest(),
+        size=size,
+        content_type=content_type,
+        preprocessing=stats,
+    )
@@ -0,0 +1,74 @@
+import json
+import re
+from typing import List
+
+_ITEMS_START = re.compile(r'"items"\s*:\s*\[')
+
+
+class ItemArrayParser:
+    '''
+    Incremental parser for the receipt document the vision model streams back.
+    feed() takes text deltas as they arrive and returns every `items[]` entry that has
+    closed since the last call, so callers can act on items before the document is complete.
+    The full text stays available in `.text` for a final, strict parse.
+    '''
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0            # next character to scan
+        self._in_array = False
+        self._done = False
+        self._depth = 0          # object/array nesting inside the items array
+        self._in_string = False
+        self._escape = False
+        self._item_start = None
+        self.count = 0
+
+    def feed(self, delta: str) -> List[dict]:
+        self.text += delta
+        items = []
+        if self._done:
+            return items
+
+        if not self._in_array:
+            match = _ITEMS_START.search(self.text)
+            if not match:
+                return items
+            self._in_array = True
+            self._pos = match.end()
+
+        text = self.text
+        pos = self._pos
+        while pos < len(text):
+            ch = text[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if self._depth == 0 and ch == "{":
+                    self._item_start = pos
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 0 and ch == "]":
+                    self._done = True
+                    pos += 1
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._item_start is not None:
+                    raw = text[self._item_start:pos + 1]
+                    self._item_start = None
+                    try:
+                        items.append(json.loads(raw))
+                        self.count += 1
+                    except json.JSONDecodeError:
+                        # Leave it to the strict parse of the full document to report
+                        pass
+            pos += 1
+        self._pos = pos
+        return items
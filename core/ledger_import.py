@@ -0,0 +1,196 @@
+import argparse
+import csv
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.ledger import insert_ledger_rows
+from db.rollups import LOCAL_TZ
+from models.stock_update import ModeEnum
+from schemas.stock_update import PurchaseCreate, SellingCreate
+
+# File/URL name -> (ledger kind, schema, timestamp column)
+LEDGERS = {
+    'purchases': ('purchase', PurchaseCreate, 'created_at'),
+    'sales': ('selling', SellingCreate, 'date'),
+}
+PAYMENT_METHODS = {mode.value.lower(): mode.value for mode in ModeEnum}
+MAX_REPORTED_REJECTS = 100
+
+
+@dataclass
+class ImportSummary:
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_rejected: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    rejects: List[dict] = field(default_factory=list)  # first MAX_REPORTED_REJECTS, as {"line", "error"}
+    committed_through_line: int = 0  # every valid row up to this CSV line is in the ledger
+    failed_lines: Optional[Tuple[int, int]] = None  # first and last line of the chunk that could not be written
+    error: Optional[str] = None
+
+    @property
+    def complete(self) -> bool:
+        return self.failed_lines is None
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_imported / self.seconds if self.seconds else 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "rows_read": self.rows_read,
+            "rows_imported": self.rows_imported,
+            "rows_rejected": self.rows_rejected,
+            "chunks": self.chunks,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "rejects": self.rejects,
+            "rejects_truncated": self.rows_rejected > len(self.rejects),
+            "committed_through_line": self.committed_through_line,
+            "failed": None if self.complete else {
+                "first_line": self.failed_lines[0],
+                "last_line": self.failed_lines[1],
+                "error": self.error,
+            },
+        }
+
+
+def _parse_timestamp(value: str) -> datetime:
+    ts = datetime.fromisoformat(value.strip())
+    # Naive spreadsheet dates are local to the vendor. Store UTC: SQLite keeps the wall-clock digits only.
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=LOCAL_TZ)
+    return ts.astimezone(timezone.utc)
+
+
+def _validate(record: dict, schema, ts_field: str, vendor_id: int, now: datetime) -> dict:
+    record = {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in record.items() if k}
+    if record.get("payment_method"):
+        record["payment_method"] = PAYMENT_METHODS.get(record["payment_method"].lower(), record["payment_method"])
+    item = schema.model_validate(record)
+    row = {**item.model_dump(), "vendor_id": vendor_id}
+    row["payment_method"] = ModeEnum(item.payment_method.value)
+    # Historical rows keep their own date (the ledger's column name, or just "date"); the rest get the import time
+    raw_ts = record.get(ts_field) or record.get("date")
+    row[ts_field] = _parse_timestamp(raw_ts) if raw_ts else now
+    return row
+
+
+def import_ledger_csv(db: Session, ledger: str, stream: TextIO, vendor_id: int,
+                      chunk_size: Optional[int] = None, rejects: Optional[TextIO] = None) -> ImportSummary:
+    """
+    Stream a CSV of purchases or sales into a vendor's ledger. The header names the columns of
+    PurchaseCreate/SellingCreate, plus an optional timestamp column. Rows are read one at a time,
+    validated against the schema and written chunk_size at a time as a batched executemany,
+    committing per chunk. Bad rows are skipped; when `rejects` is given they are copied there
+    with their line number and error.
+
+    If a chunk cannot be written it is rolled back and the import stops there: the summary
+    records the chunk's line range and the error, and committed_through_line tells the caller
+    where to resume.
+    """
+    kind, schema, ts_field = LEDGERS[ledger]
+    chunk_size = chunk_size or settings.LEDGER_IMPORT_CHUNK_SIZE
+    summary = ImportSummary()
+    started = time.perf_counter()
+    now = datetime.now(timezone.utc)
+
+    reader = csv.DictReader(stream)
+    # A header that can't be read fails the whole import up front
+    fieldnames = reader.fieldnames or []
+    reject_writer = None
+    if rejects is not None:
+        reject_writer = csv.DictWriter(rejects, fieldnames=["line", "error", *fieldnames], extrasaction="ignore")
+        reject_writer.writeheader()
+
+    def flush(chunk: List[dict], first_line: int, last_line: int) -> bool:
+        try:
+            insert_ledger_rows(db, kind, chunk, returning=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            summary.failed_lines = (first_line, last_line)
+            summary.error = f"{type(e).__name__}: {e}"
+            return False
+        summary.rows_imported += len(chunk)
+        summary.chunks += 1
+        summary.committed_through_line = last_line
+        return True
+
+    chunk = []
+    first_line = 0
+    try:
+        for record in reader:
+            summary.rows_read += 1
+            try:
+                chunk.append(_validate(record, schema, ts_field, vendor_id, now))
+            except (ValidationError, ValueError, TypeError) as e:
+                summary.rows_rejected += 1
+                error = "; ".join(f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()) \
+                    if isinstance(e, ValidationError) else str(e)
+                if len(summary.rejects) < MAX_REPORTED_REJECTS:
+                    summary.rejects.append({"line": reader.line_num, "error": error})
+                if reject_writer is not None:
+                    reject_writer.writerow({**record, "line": reader.line_num, "error": error})
+                continue
+            if len(chunk) == 1:
+                first_line = reader.line_num
+            if len(chunk) >= chunk_size:
+                if not flush(chunk, first_line, reader.line_num):
+                    break
+                chunk = []
+        else:
+            if chunk:
+                flush(chunk, first_line, reader.line_num)
+    except (csv.Error, UnicodeDecodeError) as e:
+        # The rows buffered since the last commit are dropped along with the unreadable line. A decode
+        # error surfaces when its block is read, so the range starts where reading stopped, not at the bad byte.
+        line = reader.line_num if isinstance(e, csv.Error) else reader.line_num + 1
+        summary.failed_lines = (first_line if chunk else line, line)
+        summary.error = f"{type(e).__name__}: {e}"
+
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+
+def main(argv=None):
+    from db.database import SessionLocal, create_tables
+
+    parser = argparse.ArgumentParser(prog="python -m core.ledger_import", description="Import purchases or sales from a CSV file.")
+    parser.add_argument("ledger", choices=sorted(LEDGERS))
+    parser.add_argument("csv_file")
+    parser.add_argument("--vendor-id", type=int, required=True)
+    parser.add_argument("--chunk-size", type=int, default=settings.LEDGER_IMPORT_CHUNK_SIZE)
+    parser.add_argument("--rejects", default=None, help="where to write rejected rows (default: <csv_file>.rejects.csv)")
+    args = parser.parse_args(argv)
+
+    create_tables()
+    rejects_path = args.rejects or f"{args.csv_file}.rejects.csv"
+    db = SessionLocal()
+    try:
+        with open(args.csv_file, newline="", encoding="utf-8-sig") as stream, \
+                open(rejects_path, "w", newline="", encoding="utf-8") as rejects:
+            summary = import_ledger_csv(db, args.ledger, stream, args.vendor_id, args.chunk_size, rejects)
+    finally:
+        db.close()
+
+    print(f"Imported {summary.rows_imported}/{summary.rows_read} rows in {summary.chunks} chunk(s), "
+          f"{summary.seconds:.2f}s ({summary.rows_per_second:.0f} rows/s)")
+    if summary.rows_rejected:
+        print(f"Rejected {summary.rows_rejected} row(s), see {rejects_path}")
+    if not summary.complete:
+        first, last = summary.failed_lines
+        print(f"Stopped: lines {first}-{last} could not be written ({summary.error}). "
+              f"Rows through line {summary.committed_through_line} are in the ledger.")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Mapping, Optional
+
+# A status of 0 marks a negative entry for a request that never got an answer (timeout, connection error)
+NO_RESPONSE = 0
+
+
+@dataclass
+class CachedPage:
+    url: str
+    status: int
+    body: Optional[bytes]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fresh_until: float
+
+    @property
+    def negative(self) -> bool:
+        return self.status == NO_RESPONSE or self.status >= 400
+
+    @property
+    def fresh(self) -> bool:
+        return time.time() < self.fresh_until
+
+    @property
+    def revalidatable(self) -> bool:
+        return not self.negative and bool(self.etag or self.last_modified)
+
+
+def parse_cache_control(value: Optional[str]) -> dict:
+    """'public, max-age=600, no-cache' -> {'public': None, 'max-age': '600', 'no-cache': None}"""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    """An HTTP-date header as a Unix timestamp, or None when it isn't one."""
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def freshness_seconds(headers: Mapping[str, str], default_ttl: float) -> Optional[float]:
+    """
+    How long a 200 may be served without asking the origin again, or None when it must not be stored.
+    max-age wins; no-cache stores the page but revalidates every time. Without max-age, Expires
+    counts from the response's Date (or now), and an unparseable Expires means already stale.
+    With neither, default_ttl applies.
+    """
+    directives = parse_cache_control(headers.get("Cache-Control"))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    for name in ("s-maxage", "max-age"):
+        if directives.get(name):
+            try:
+                return max(0.0, float(directives[name]))
+            except ValueError:
+                pass
+    if "Expires" in headers:
+        expires = _http_date(headers.get("Expires"))
+        if expires is None:
+            return 0.0
+        date = _http_date(headers.get("Date"))
+        return max(0.0, expires - (date if date is not None else time.time()))
+    return default_ttl
+
+
+class PageCache:
+    '''
+    Persistent HTTP response cache for scraped pages. Bodies are zlib-compressed and kept in a
+    SQLite file together with their validators (ETag / Last-Modified) and freshness deadline.
+    Failed fetches are stored as short-lived negative entries. When the stored bodies exceed
+    `max_bytes`, the least recently used pages are evicted.
+
+    The sqlite3 calls block, so the async wrappers run them on a thread.
+    '''
+
+    def __init__(self, directory: str, *, max_bytes: int, default_ttl: float, negative_ttl: float):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "pages.sqlite3")
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, status INTEGER NOT NULL, body BLOB, size INTEGER NOT NULL DEFAULT 0,"
+            " etag TEXT, last_modified TEXT, fresh_until REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_pages_accessed_at ON pages (accessed_at)")
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+
+    # Blocking implementations
+
+    def _get(self, url: str) -> Optional[CachedPage]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, body, etag, last_modified, fresh_until FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        status, body, etag, last_modified, fresh_until = row
+        return CachedPage(
+            url=url,
+            status=status,
+            body=zlib.decompress(body) if body is not None else None,
+            etag=etag,
+            last_modified=last_modified,
+            fresh_until=fresh_until,
+        )
+
+    def _put(self, url: str, status: int, body: Optional[bytes], etag: Optional[str],
+             last_modified: Optional[str], ttl: float) -> None:
+        blob = zlib.compress(body, 6) if body is not None else None
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, status, body, size, etag, last_modified, fresh_until, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, blob, len(blob or b""), etag, last_modified, now + ttl, now),
+            )
+            self._evict()
+
+    def _touch(self, url: str, ttl: float, etag: Optional[str], last_modified: Optional[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET fresh_until = ?, accessed_at = ?,"
+                " etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now + ttl, now, etag, last_modified, url),
+            )
+
+    def _delete(self, url: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+
+    def _evict(self) -> None:
+        # Caller holds the lock
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Expired negative entries go first, then pages in least-recently-used order
+        self._conn.execute("DELETE FROM pages WHERE body IS NULL AND fresh_until < ?", (time.time(),))
+        doomed = []
+        for url, size in self._conn.execute("SELECT url, size FROM pages ORDER BY accessed_at"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((url,))
+            total -= size
+        self._conn.executemany("DELETE FROM pages WHERE url = ?", doomed)
+
+    def _stats(self) -> dict:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+        }
+
+    # Async API used by the fetcher
+
+    async def get(self, url: str) -> Optional[CachedPage]:
+        return await asyncio.to_thread(self._get, url)
+
+    async def store(self, url: str, body: bytes, headers: Mapping[str, str]) -> None:
+        ttl = freshness_seconds(headers, self.default_ttl)
+        if ttl is None:
+            await asyncio.to_thread(self._delete, url)
+            return
+        await asyncio.to_thread(
+            self._put, url, 200, body, headers.get("ETag"), headers.get("Last-Modified"), ttl
+        )
+
+    async def store_failure(self, url: str, status: int = NO_RESPONSE) -> None:
+        await asyncio.to_thread(self._put, url, status, None, None, None, self.negative_ttl)
+
+    async def revalidated(self, url: str, headers: Mapping[str, str]) -> None:
+        """Record a 304: the stored body is good for another freshness lifetime."""
+        self.revalidations += 1
+        ttl = freshness_seconds(headers, self.default_ttl)
+        await asyncio.to_thread(
+            self._touch, url, ttl or 0.0, headers.get("ETag"), headers.get("Last-Modified")
+        )
+
+    def snapshot(self) -> dict:
+        return self._stats()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
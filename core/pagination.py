@@ -0,0 +1,78 @@
+import base64
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, String, cast, literal, tuple_
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import Query
+
+from db.rollups import LOCAL_TZ
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Day bounds are UTC instants. SQLite stores timestamps as text with UTC wall-clock digits, so they
+# are bound the same way, to the second, which compares correctly against both SQLAlchemy-written
+# ("... HH:MM:SS.ffffff") and server-default ("... HH:MM:SS") values. Postgres gets an aware datetime.
+_BOUND_TYPE = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"),
+    "sqlite",
+)
+
+
+def encode_cursor(ts: str, row_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([ts, row_id]).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        ts, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return str(ts), int(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def day_start(day: date) -> datetime:
+    """The UTC instant a vendor-facing (TIMEZONE) calendar day begins, as db.rollups.local_day buckets it."""
+    return datetime.combine(day, time.min, tzinfo=LOCAL_TZ).astimezone(timezone.utc)
+
+
+def day_bounds(ts_col, start: Optional[date] = None, end: Optional[date] = None) -> list:
+    """
+    WHERE clauses limiting ts_col to the inclusive local calendar days [start, end], so a day
+    range selects the same rows as the analytics rollups for those days.
+    """
+    clauses = []
+    if start:
+        clauses.append(ts_col >= literal(day_start(start), _BOUND_TYPE))
+    if end:
+        clauses.append(ts_col < literal(day_start(end + timedelta(days=1)), _BOUND_TYPE))
+    return clauses
+
+
+def keyset_page(query: Query, ts_col, id_col, *, limit: int, cursor: Optional[str] = None,
+                start: Optional[date] = None, end: Optional[date] = None) -> tuple:
+    """
+    Newest-first page of `query` ordered by (ts_col, id_col), plus the cursor for the next page
+    (None on the last page). start/end are inclusive local calendar days (see day_bounds).
+
+    Cursors carry the timestamp exactly as the database returned it as text and are compared as
+    text literals: SQLite stores timestamps as strings whose format depends on who wrote them
+    (server default vs. SQLAlchemy), so re-encoding a parsed datetime would not compare equal
+    to the stored value. Postgres casts the literals back to timestamps.
+    """
+    raw_ts = cast(ts_col, String)
+    query = query.add_columns(raw_ts).filter(*day_bounds(ts_col, start, end))
+    if cursor:
+        cursor_ts, cursor_id = decode_cursor(cursor)
+        query = query.filter(tuple_(ts_col, id_col) < tuple_(literal(cursor_ts, String), literal(cursor_id)))
+
+    rows = query.order_by(ts_col.desc(), id_col.desc()).limit(limit + 1).all()
+    items = [row[0] for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last, last_ts = rows[limit - 1]
+        next_cursor = encode_cursor(last_ts, getattr(last, id_col.key))
+    return items, next_cursor
@@ -32,4 +32,24 @@ Accept any food & beverage vendor, not just specialized products.
 Events must be upcoming, preferably within the next 1–2 months.
 If no relevant events are found, return an empty list: [].
  
- '''
\ No newline at end of file
+ '''
+
+
+def receipt_prompt(intent: str) -> str:
+    return (
+        f"The vendor selected '{intent}'. "
+        "Extract *all* line‑items from the receipt and output *only* one valid JSON document "
+        "with this exact structure (no markdown fences!):\n\n"
+        "{\n"
+        f"  \"intent\": \"{intent}\",\n"
+        "  \"items\": [\n"
+        "    {\n"
+        "      \"item_name\": \"string\",\n"
+        "      \"quantity\": int,\n"
+        "      \"price\": float,\n"
+        "      \"payment_method\": \"online|Cash\"\n"
+        "    },\n"
+        "    …\n"
+        "  ]\n"
+        "}\n"
+    )
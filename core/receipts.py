@@ -0,0 +1,187 @@
+import asyncio
+import json
+from typing import TYPE_CHECKING, AsyncIterator, List
+
+from core.json_stream import ItemArrayParser
+from core.vision_ai import extract_text_async, stream_text_async, receipt_cache, receipt_cache_key
+from core.vision_providers import CircuitOpenError
+from models.stock_update import ModeEnum
+
+if TYPE_CHECKING:
+    # core.ingest imports ReceiptError from here, so only type checkers may import it back
+    from core.ingest import IngestedImage
+
+INTENTS = ['purchase', 'selling']
+
+
+class ReceiptError(ValueError):
+    '''
+    A receipt that cannot be turned into ledger rows. status_code is the HTTP status the
+    upload endpoints answer with: 502 when the model output is unusable, 400 when the receipt itself is.
+    '''
+
+    def __init__(self, detail: str, status_code: int = 400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+async def extract_receipt(image: "IngestedImage", intent: str) -> tuple:
+    """
+    Return (raw_json, cached) for an image, consulting the receipt cache first.
+    Model failures surface as ReceiptError so every receipt path (uploads, batches, jobs) can report them.
+    """
+    cached_raw = await receipt_cache.get(receipt_cache_key(image.sha256, intent))
+    if cached_raw is not None:
+        return cached_raw, True
+
+    # Awaited, so other requests keep being served while the model works
+    try:
+        json_str = await extract_text_async(image.data_url, intent)
+    except CircuitOpenError:
+        raise ReceiptError("AI service is temporarily unavailable, please retry shortly", 503)
+    except asyncio.TimeoutError:
+        raise ReceiptError("AI service timed out", 504)
+    except Exception as e:
+        raise ReceiptError(f"AI processing failed: {str(e)}", 502)
+    return (json_str or "").strip(), False
+
+
+async def stream_receipt(image: "IngestedImage", intent: str) -> AsyncIterator[tuple]:
+    """
+    Streaming counterpart of extract_receipt. Yields ("item", raw_item) as soon as each
+    items[] entry closes in the model output, then ("done", (raw_json, cached)).
+    The items are unvalidated; callers still run the strict parse on raw_json at the end.
+    """
+    cached_raw = await receipt_cache.get(receipt_cache_key(image.sha256, intent))
+    if cached_raw is not None:
+        for item in parse_receipt_payload(cached_raw, intent):
+            yield "item", item
+        yield "done", (cached_raw, True)
+        return
+
+    parser = ItemArrayParser()
+    try:
+        async for delta in stream_text_async(image.data_url, intent):
+            for item in parser.feed(delta):
+                yield "item", item
+    except CircuitOpenError:
+        raise ReceiptError("AI service is temporarily unavailable, please retry shortly", 503)
+    except asyncio.TimeoutError:
+        raise ReceiptError("AI service timed out", 504)
+    except Exception as e:
+        raise ReceiptError(f"AI processing failed: {str(e)}", 502)
+    yield "done", (parser.text.strip(), False)
+
+
+async def remember_receipt(image: "IngestedImage", intent: str, raw: str) -> None:
+    # Only cache extractions that made it all the way into the ledger
+    await receipt_cache.set(receipt_cache_key(image.sha256, intent), raw)
+
+
+def parse_receipt_payload(raw: str, intent: str) -> List[dict]:
+    """Parse the model's JSON document and return its raw `items` list."""
+    raw = (raw or "").strip()
+    if not raw:
+        raise ReceiptError("AI service returned empty response", 502)
+
+    try:
+        payload = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise ReceiptError(f"Invalid JSON from AI service: {str(e)}", 502)
+
+    if not isinstance(payload, dict):
+        raise ReceiptError("AI response is not a valid JSON object", 502)
+
+    if payload.get("intent") != intent:
+        raise ReceiptError(f"Intent mismatch. Expected: {intent}, Got: {payload.get('intent')}", 502)
+
+    if "items" not in payload or not isinstance(payload["items"], list):
+        raise ReceiptError("No 'items' list found in AI response", 502)
+
+    items = payload["items"]
+    if not items:
+        raise ReceiptError("No items found in the receipt", 400)
+    return items
+
+
+def validate_item(item: dict, idx: int) -> dict:
+    """Validate one extracted line item and return it with normalized types."""
+    if not isinstance(item, dict):
+        raise ReceiptError(f"Invalid item {idx + 1}: expected an object")
+
+    # Validate item structure
+    required_fields = ["item_name", "quantity", "price", "payment_method"]
+    for field in required_fields:
+        if field not in item:
+            raise ReceiptError(f"Missing required field '{field}' in item {idx + 1}")
+
+    # Validate and convert data types
+    item_name = str(item["item_name"]).strip()
+    if not item_name:
+        raise ReceiptError(f"Empty item name in item {idx + 1}")
+
+    try:
+        quantity = int(float(item["quantity"]))
+    except (ValueError, TypeError):
+        raise ReceiptError(f"Invalid quantity format in item {idx + 1}: {item['quantity']}")
+    if quantity <= 0:
+        raise ReceiptError(f"Invalid quantity in item {idx + 1}: {quantity}")
+
+    try:
+        price = float(item["price"])
+    except (ValueError, TypeError):
+        raise ReceiptError(f"Invalid price format in item {idx + 1}: {item['price']}")
+    if price < 0:
+        raise ReceiptError(f"Invalid price in item {idx + 1}: {price}")
+
+    # Validate payment method
+    payment_method = str(item["payment_method"]).strip()
+    if payment_method not in ["Cash", "online"]:
+        payment_method = "Cash"
+
+    return {
+        "item_name": item_name,
+        "quantity": quantity,
+        "price": price,
+        "payment_method": payment_method,
+    }
+
+
+def validate_items(items: List[dict]) -> List[dict]:
+    return [validate_item(item, idx) for idx, item in enumerate(items)]
+
+
+def build_row(intent: str, item: dict, vendor_id: int) -> dict:
+    """Turn a validated item into a ledger row for db.ledger.insert_ledger_rows."""
+    row = {
+        "item_name": item["item_name"],
+        "quantity": item["quantity"],
+        "payment_method": ModeEnum(item["payment_method"]),
+        "vendor_id": vendor_id,
+    }
+    row["price" if intent == 'purchase' else "total_price"] = item["price"]
+    return row
+
+
+def record_to_item(intent: str, record) -> dict:
+    """Response shape shared by the receipt endpoints; works for ORM objects and RETURNING rows."""
+    if intent == 'purchase':
+        return {
+            "id": record.id,
+            "item_name": record.item_name,
+            "quantity": record.quantity,
+            "price": record.price,
+            "payment_method": record.payment_method.value,
+            "created_at": record.created_at.isoformat() if record.created_at else None,
+            "vendor_id": record.vendor_id
+        }
+    return {
+        "id": record.id,
+        "item_name": record.item_name,
+        "quantity": record.quantity,
+        "price": record.total_price,
+        "payment_method": record.payment_method.value,
+        "created_at": record.date.isoformat() if record.date else None,
+        "vendor_id": record.vendor_id
+    }
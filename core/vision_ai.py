@@ -1,60 +1,53 @@
-import os
-import base64
-from groq import Groq
+import asyncio
+from typing import AsyncIterator, Optional
+from core.cache import TieredCache, redis_cache_url
 from core.config import settings
+from core.vision_providers import VisionProvider, build_vision_provider
 
+# One provider per process: it owns the pooled SDK client and the circuit breaker state,
+# so building it per call would throw away keep-alive connections and failure history.
+_provider: Optional[VisionProvider] = None
+_semaphore: Optional[asyncio.Semaphore] = None
 
-def extract_text(image_path: str, intent: str) -> str:
-    # Read image and encode as base64
-    with open(image_path, "rb") as img_file:
-        img_bytes = img_file.read()
-        img_b64 = base64.b64encode(img_bytes).decode("utf-8")
-    IMAGE_DATA_URL = f"data:image/jpeg;base64,{img_b64}"
-
-    client = Groq(api_key=settings.GROQ_API_KEY)
-
-    client = Groq(api_key=settings.GROQ_API_KEY)
-    completion = client.chat.completions.create(
-        model="meta-llama/llama-4-maverick-17b-128e-instruct",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": (
-                            f"The vendor selected '{intent}'. "
-                            "Extract *all* line‑items from the receipt and output *only* one valid JSON document "
-                            "with this exact structure (no markdown fences!):\n\n"
-                            "{\n"
-                            f"  \"intent\": \"{intent}\",\n"
-                            "  \"items\": [\n"
-                            "    {\n"
-                            "      \"item_name\": \"string\",\n"
-                            "      \"quantity\": int,\n"
-                            "      \"price\": float,\n"
-                            "      \"payment_method\": \"online|Cash\"\n"
-                            "    },\n"
-                            "    …\n"
-                            "  ]\n"
-                            "}\n"
-                        )
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": IMAGE_DATA_URL}
-                    }
-                ]
-            }
-        ],
-        temperature=0.0,
-        max_completion_tokens=512,
-        top_p=1,
-        stream=False,
-    )
-
-
-    # Get the JSON string from the model's response
-    content = completion.choices[0].message.content
-    
-    return content
\ No newline at end of file
+# Extraction results keyed by image digest + intent, so re-uploads of the same photo skip the model.
+receipt_cache = TieredCache(
+    namespace="receipt",
+    ttl_seconds=settings.RECEIPT_CACHE_TTL_SECONDS,
+    max_entries=settings.RECEIPT_CACHE_MAX_ENTRIES,
+    redis_url=redis_cache_url(),
+)
+
+
+def receipt_cache_key(image_sha256: str, intent: str) -> str:
+    return f"{intent}:{image_sha256}"
+
+
+def get_vision_provider() -> VisionProvider:
+    global _provider
+    if _provider is None:
+        _provider = build_vision_provider()
+    return _provider
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.VISION_MAX_CONCURRENCY)
+    return _semaphore
+
+
+async def extract_text_async(image_data_url: str, intent: str) -> str:
+    """
+    Extract the receipt JSON for an image given as a base64 data URL (see core.ingest).
+    At most VISION_MAX_CONCURRENCY calls are in flight per process; deadlines, retries and
+    the circuit breaker are handled by the provider (see core.vision_providers).
+    """
+    async with _get_semaphore():
+        return await get_vision_provider().extract(image_data_url, intent)
+
+
+async def stream_text_async(image_data_url: str, intent: str) -> AsyncIterator[str]:
+    """Streaming variant of extract_text_async: yields the model's text deltas as they arrive."""
+    async with _get_semaphore():
+        async for delta in get_vision_provider().stream(image_data_url, intent):
+            yield delta
@@ -0,0 +1,325 @@
+import abc
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from typing import AsyncIterator, Optional
+
+import groq
+from groq import AsyncGroq
+
+from core.config import settings
+from core.prompts import receipt_prompt
+
+logger = logging.getLogger(__name__)
+
+
+class VisionProviderError(Exception):
+    '''
+    Raised by vision providers. retryable marks failures worth another attempt
+    (timeouts, connection drops, rate limits, 5xx) as opposed to bad requests.
+    '''
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+class VisionDeadlineExceeded(VisionProviderError, TimeoutError):
+    def __init__(self, message: str = "Vision provider deadline exceeded"):
+        super().__init__(message, retryable=True)
+
+
+class CircuitOpenError(VisionProviderError):
+    def __init__(self, message: str = "Vision provider circuit is open"):
+        super().__init__(message, retryable=False)
+
+
+class VisionProvider(abc.ABC):
+    '''
+    Turns a receipt image (base64 data URL) into the model's JSON text for an intent.
+    Subclasses implement extract(); stream() is optional.
+    '''
+    name = "base"
+
+    @abc.abstractmethod
+    async def extract(self, image_data_url: str, intent: str) -> str:
+        ...
+
+    async def stream(self, image_data_url: str, intent: str) -> AsyncIterator[str]:
+        # Providers without native streaming hand back the whole document as one delta
+        yield await self.extract(image_data_url, intent)
+
+
+class GroqVisionProvider(VisionProvider):
+    name = "groq"
+
+    # The SDK's own retries would stack on top of ResilientVisionProvider's, so they are off.
+    RETRYABLE = (
+        groq.APITimeoutError,
+        groq.APIConnectionError,
+        groq.RateLimitError,
+        groq.InternalServerError,
+    )
+
+    def __init__(self, api_key: str, model: str, timeout: float):
+        self.model = model
+        self.client = AsyncGroq(api_key=api_key, timeout=timeout, max_retries=0)
+
+    def _kwargs(self, image_data_url: str, intent: str, stream: bool) -> dict:
+        return dict(
+            model=self.model,
+            messages=[
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": receipt_prompt(intent)},
+                        {"type": "image_url", "image_url": {"url": image_data_url}},
+                    ],
+                }
+            ],
+            temperature=0.0,
+            max_completion_tokens=512,
+            top_p=1,
+            stream=stream,
+        )
+
+    def _wrap(self, e: Exception) -> VisionProviderError:
+        return VisionProviderError(f"{type(e).__name__}: {e}", retryable=isinstance(e, self.RETRYABLE))
+
+    async def extract(self, image_data_url: str, intent: str) -> str:
+        try:
+            completion = await self.client.chat.completions.create(**self._kwargs(image_data_url, intent, False))
+        except groq.GroqError as e:
+            raise self._wrap(e)
+        return completion.choices[0].message.content
+
+    async def stream(self, image_data_url: str, intent: str) -> AsyncIterator[str]:
+        try:
+            stream = await self.client.chat.completions.create(**self._kwargs(image_data_url, intent, True))
+        except groq.GroqError as e:
+            raise self._wrap(e)
+        try:
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except groq.GroqError as e:
+            raise self._wrap(e)
+        finally:
+            await stream.close()
+
+
+class FakeVisionProvider(VisionProvider):
+    '''
+    Deterministic offline stand-in for load tests: the same image always yields the same items,
+    after a fixed simulated latency, so the rest of the upload path can be measured on its own.
+    '''
+    name = "fake"
+
+    ITEMS = ["Pav", "Potato", "Besan", "Oil", "Green Chilli", "Onion", "Tea Powder", "Sugar", "Milk", "Bread"]
+
+    def __init__(self, latency_seconds: float = 0.0, chunk_size: int = 24):
+        self.latency_seconds = latency_seconds
+        self.chunk_size = chunk_size
+
+    def document(self, image_data_url: str, intent: str) -> str:
+        digest = hashlib.sha256(image_data_url.encode("ascii", "ignore")).digest()
+        count = 1 + digest[0] % 5
+        items = [
+            {
+                "item_name": self.ITEMS[digest[i + 1] % len(self.ITEMS)],
+                "quantity": 1 + digest[i + 6] % 10,
+                "price": round(5 + digest[i + 11] * 1.5, 2),
+                "payment_method": "online" if digest[i + 16] % 2 else "Cash",
+            }
+            for i in range(count)
+        ]
+        return json.dumps({"intent": intent, "items": items})
+
+    async def extract(self, image_data_url: str, intent: str) -> str:
+        await asyncio.sleep(self.latency_seconds)
+        return self.document(image_data_url, intent)
+
+    async def stream(self, image_data_url: str, intent: str) -> AsyncIterator[str]:
+        text = self.document(image_data_url, intent)
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+        for chunk in chunks:
+            await asyncio.sleep(self.latency_seconds / len(chunks))
+            yield chunk
+
+
+class CircuitBreaker:
+    '''
+    Opens after `failure_threshold` consecutive failures and fails fast for `reset_seconds`;
+    then lets a single trial call through (half-open) and closes again if it succeeds.
+    '''
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        # A call that was cancelled says nothing about provider health, but must not hold the trial slot
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning(f"Vision provider circuit opened after {self.failures} failures")
+            self.opened_at = time.monotonic()
+
+
+class ResilientVisionProvider(VisionProvider):
+    '''
+    Wraps a provider with a hard overall deadline, jittered retries on retryable errors and a circuit breaker.
+    Each attempt gets at most `attempt_timeout`, and all attempts together at most `deadline`.
+    '''
+
+    def __init__(self, inner: VisionProvider, *, deadline: float, attempt_timeout: float,
+                 max_retries: int, breaker: CircuitBreaker, backoff_base: float = 0.25, backoff_cap: float = 4.0):
+        self.inner = inner
+        self.name = inner.name
+        self.deadline = deadline
+        self.attempt_timeout = attempt_timeout
+        self.max_retries = max_retries
+        self.breaker = breaker
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def _check_breaker(self) -> None:
+        if not self.breaker.allow():
+            raise CircuitOpenError()
+
+    def _failed(self, e: Exception) -> VisionProviderError:
+        if isinstance(e, asyncio.TimeoutError) and not isinstance(e, VisionProviderError):
+            e = VisionDeadlineExceeded(f"Vision provider did not answer within {self.attempt_timeout}s")
+        if not isinstance(e, VisionProviderError):
+            e = VisionProviderError(f"{type(e).__name__}: {e}")
+        if e.retryable:
+            self.breaker.record_failure()
+        else:
+            # A rejected request says nothing about provider health
+            self.breaker.record_success()
+        return e
+
+    async def extract(self, image_data_url: str, intent: str) -> str:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        attempt = 0
+        while True:
+            self._check_breaker()
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise VisionDeadlineExceeded()
+            try:
+                result = await asyncio.wait_for(
+                    self.inner.extract(image_data_url, intent), timeout=min(self.attempt_timeout, remaining)
+                )
+            except Exception as e:
+                error = self._failed(e)
+                delay = self._backoff(attempt)
+                if not error.retryable or attempt >= self.max_retries or loop.time() + delay >= deadline:
+                    raise error
+                logger.info(f"Vision provider '{self.name}' attempt {attempt + 1} failed ({error}); retrying in {delay:.2f}s")
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancellation (client gone, deadline of a caller) bypasses `except Exception`
+                self.breaker.release_trial()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def stream(self, image_data_url: str, intent: str) -> AsyncIterator[str]:
+        # Retries are only safe before the first delta has been handed to the caller
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+        attempt = 0
+        while True:
+            self._check_breaker()
+            started = False
+            chunks = self.inner.stream(image_data_url, intent).__aiter__()
+            try:
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise VisionDeadlineExceeded()
+                    timeout = remaining if started else min(self.attempt_timeout, remaining)
+                    try:
+                        delta = await asyncio.wait_for(chunks.__anext__(), timeout=timeout)
+                    except StopAsyncIteration:
+                        break
+                    started = True
+                    yield delta
+            except Exception as e:
+                error = self._failed(e)
+                delay = self._backoff(attempt)
+                if started or not error.retryable or attempt >= self.max_retries or loop.time() + delay >= deadline:
+                    raise error
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # CancelledError, or GeneratorExit when the consumer stops iterating (SSE client disconnect)
+                self.breaker.release_trial()
+                raise
+            finally:
+                await chunks.aclose()
+            self.breaker.record_success()
+            return
+
+
+def build_vision_provider() -> VisionProvider:
+    """The provider selected by VISION_PROVIDER, wrapped with deadlines, retries and the circuit breaker."""
+    if settings.VISION_PROVIDER == "fake":
+        inner = FakeVisionProvider(latency_seconds=settings.VISION_FAKE_LATENCY_MS / 1000)
+    elif settings.VISION_PROVIDER == "groq":
+        inner = GroqVisionProvider(
+            api_key=settings.GROQ_API_KEY,
+            model=settings.VISION_MODEL,
+            timeout=settings.VISION_TIMEOUT_SECONDS,
+        )
+    else:
+        raise ValueError(f"Unknown VISION_PROVIDER '{settings.VISION_PROVIDER}'")
+    return ResilientVisionProvider(
+        inner,
+        deadline=settings.VISION_DEADLINE_SECONDS,
+        attempt_timeout=settings.VISION_TIMEOUT_SECONDS,
+        max_retries=settings.VISION_MAX_RETRIES,
+        breaker=CircuitBreaker(settings.VISION_BREAKER_THRESHOLD, settings.VISION_BREAKER_RESET_SECONDS),
+    )
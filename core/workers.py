@@ -0,0 +1,46 @@
+import asyncio
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Optional
+
+from core.config import settings
+
+# CPU-bound helpers (image decoding, HTML parsing) run here instead of on the event loop.
+# "spawn" keeps the children free of the parent's threads, sockets and DB connections.
+# Spawned children also re-import the parent's __main__ script, so that must stay free of
+# side effects at import time (main.py creates its tables in a startup hook, not on import).
+_pool: Optional[ProcessPoolExecutor] = None
+
+# What the pool's functions live in, loaded once per child as it starts
+WORKER_MODULES = ("core.image_preprocess", "core.event_extraction")
+
+
+def _init_worker() -> None:
+    for module in WORKER_MODULES:
+        importlib.import_module(module)
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.WORKER_PROCESSES or None,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _pool
+
+
+async def run_in_process(fn, *args, **kwargs):
+    """Await a picklable top-level function on the shared process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), partial(fn, *args, **kwargs))
+
+
+def shutdown_process_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
@@ -1,13 +1,90 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 
 from core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+# Async drivers for the sync URLs DATABASE_URL is written with
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+}
+
+def async_database_url(url: str) -> str:
+    """DATABASE_URL with its driver swapped for the asyncio one (sqlite -> aiosqlite, postgresql -> asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def _sqlite_pragmas(engine: Engine, read_only: bool) -> None:
+    # WAL lets readers run alongside the single writer (web tier and Celery worker alike);
+    # busy_timeout makes a blocked writer wait for the lock instead of failing with "database is locked".
+    pragmas = [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+def engine_options(url: str, read_only: bool = False) -> dict:
+    """create_engine keyword arguments for the database profile behind `url`."""
+    backend = make_url(url).get_backend_name()
+    if backend == 'sqlite':
+        # One file, one writer: a connection per thread is cheap, and the pragmas do the tuning
+        return {"connect_args": {"check_same_thread": False}}
+    options = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if read_only and backend in ('postgresql', 'postgres'):
+        options["connect_args"] = {"options": "-c default_transaction_read_only=on"}
+    return options
+
+def make_engine(url: str, read_only: bool = False) -> Engine:
+    """The one place engines are built, so the web tier and the Celery worker share a profile."""
+    engine = create_engine(url, **engine_options(url, read_only))
+    if engine.dialect.name == 'sqlite':
+        _sqlite_pragmas(engine, read_only)
+    return engine
+
+def make_async_engine(url: str):
+    options = engine_options(url)
+    options.pop("connect_args", None)
+    engine = create_async_engine(async_database_url(url), **options)
+    if engine.dialect.name == 'sqlite':
+        _sqlite_pragmas(engine.sync_engine, read_only=False)
+    return engine
+
+engine = make_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# GET endpoints read through their own pool: a replica when DATABASE_READ_URL is set, otherwise
+# the primary with read-only connections. Replicas can lag, so don't read your own writes from it.
+read_engine = make_engine(settings.DATABASE_READ_URL or settings.DATABASE_URL, read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# Same database for the async handlers, so their queries don't block the event loop.
+# expire_on_commit=False: attribute access after commit would otherwise need an implicit (sync) reload.
+async_engine = make_async_engine(settings.DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -15,5 +92,25 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def dispose_engines() -> None:
+    """Drop inherited pool connections in a forked child (e.g. a prefork Celery worker); the parent keeps its own."""
+    engine.dispose(close=False)
+    read_engine.dispose(close=False)
+
 def create_tables():
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add indexes introduced since they were created
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
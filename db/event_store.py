@@ -0,0 +1,202 @@
+import argparse
+import time
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.etag import VENDOR_EVENTS, bump_version
+from core.event_extraction import parse_event_day
+from db.upsert import insert_missing_rows, upsert_rows
+from models.VendorEvent import Event, EventDiscoveryRun, VendorEvent, VendorEventLink
+from models.vendor import Vendor
+
+# Columns a later run may correct for an event it finds again
+_EVENT_FIELDS = ["city", "event_day", "event_name", "description", "location", "contact_phone", "stall_info", "event_date"]
+
+
+def city_key(location: str) -> str:
+    """The area discovery runs are shared by: the last comma-separated part of a vendor's location."""
+    location = " ".join((location or "").lower().split())
+    return location.split(',')[-1].strip() if ',' in location else location
+
+
+def get_run(db: Session, city: str) -> Optional[EventDiscoveryRun]:
+    # populate_existing: a run re-read after waiting on the city lock must not come from the identity map
+    return db.scalars(
+        select(EventDiscoveryRun).where(EventDiscoveryRun.city == city).execution_options(populate_existing=True)
+    ).first()
+
+
+def run_is_fresh(run: Optional[EventDiscoveryRun]) -> bool:
+    if run is None:
+        return False
+    return datetime.utcnow() - run.finished_at < timedelta(seconds=settings.EVENT_CITY_REFRESH_SECONDS)
+
+
+def store_discovery_run(db: Session, city: str, events: Iterable, vendor_id: Optional[int] = None) -> int:
+    """
+    Upsert the events of a finished discovery run (EventResponse-like objects) into the city's
+    store, keyed by source URL, and record the run. Returns how many events the run found.
+    The caller commits.
+    """
+    now = datetime.utcnow()
+    rows = {}
+    for event in events:
+        if not event.source_url:
+            continue
+        rows[event.source_url] = {
+            "source_url": event.source_url,
+            "city": city,
+            "event_day": parse_event_day(event.event_date),
+            "event_name": event.event_name,
+            "description": event.description,
+            "location": event.location,
+            "contact_phone": event.contact_phone,
+            "stall_info": event.stall_info,
+            "event_date": event.event_date,
+            "created_at": now,
+            "updated_at": now,
+        }
+    upsert_rows(db, Event, list(rows.values()), ["source_url"], replace_cols=_EVENT_FIELDS + ["updated_at"])
+    # Vendors already following this city see the refreshed events on their next request
+    linked = db.scalars(
+        select(VendorEventLink.vendor_id).distinct()
+        .join(Event, Event.id == VendorEventLink.event_id)
+        .where(Event.city == city)
+    ).all()
+    if linked and rows:
+        bump_version(db, linked, VENDOR_EVENTS)
+    upsert_rows(
+        db, EventDiscoveryRun,
+        [{"city": city, "vendor_id": vendor_id, "events_found": len(rows), "finished_at": now}],
+        ["city"], replace_cols=["vendor_id", "events_found", "finished_at"],
+    )
+    return len(rows)
+
+
+def link_city_events(db: Session, vendor_id: int, city: str) -> int:
+    """
+    Attach a vendor to every stored event of their city they aren't linked to yet, and bump their
+    vendor-events version when that adds anything so cached lists revalidate. Returns how many links
+    were added. Nothing is written when the vendor is up to date. The caller commits.
+    """
+    already_linked = (
+        select(VendorEventLink.id)
+        .where(VendorEventLink.vendor_id == vendor_id, VendorEventLink.event_id == Event.id)
+        .exists()
+    )
+    missing = db.scalars(select(Event.id).where(Event.city == city, ~already_linked)).all()
+    if not missing:
+        return 0
+    # ON CONFLICT DO NOTHING still covers a concurrent request linking the same vendor
+    insert_missing_rows(
+        db, VendorEventLink,
+        [{"vendor_id": vendor_id, "event_id": event_id, "created_at": datetime.utcnow()} for event_id in missing],
+        ["vendor_id", "event_id"],
+    )
+    bump_version(db, [vendor_id], VENDOR_EVENTS)
+    return len(missing)
+
+
+def vendor_events(db: Session, vendor_id: int, today: Optional[date] = None) -> List[Event]:
+    """A vendor's linked events that haven't passed yet, soonest first; undated events come last."""
+    today = today or date.today()
+    return db.scalars(
+        select(Event)
+        .join(VendorEventLink, VendorEventLink.event_id == Event.id)
+        .where(VendorEventLink.vendor_id == vendor_id)
+        .where(or_(Event.event_day.is_(None), Event.event_day >= today))
+        .order_by(Event.event_day.is_(None), Event.event_day, Event.id)
+    ).all()
+
+
+def migrate_legacy_events(db: Session, chunk_size: int = 1000) -> dict:
+    """
+    Copy the events discovery used to store per vendor (vendor_events) into the city store and link
+    each to its vendor. Events and links that already exist are left alone, so running it again
+    changes nothing. Rows without a source URL, or whose vendor is gone, are skipped. Returns how
+    many rows were read, linked and skipped. The caller commits.
+    """
+    cities = {vendor_id: city_key(location) for vendor_id, location in db.execute(select(Vendor.id, Vendor.Location))}
+    counts = {"read": 0, "linked": 0, "skipped": 0}
+    linked_vendors = set()
+    last_id = 0
+    while True:
+        legacy = db.scalars(
+            select(VendorEvent).where(VendorEvent.id > last_id).order_by(VendorEvent.id).limit(chunk_size)
+        ).all()
+        if not legacy:
+            break
+        last_id = legacy[-1].id
+        counts["read"] += len(legacy)
+
+        events, links = {}, []
+        for row in legacy:
+            vendor_id = int(row.vendor_id) if str(row.vendor_id or "").isdigit() else None
+            if not row.source_url or vendor_id not in cities:
+                counts["skipped"] += 1
+                continue
+            created_at = row.created_at or datetime.utcnow()
+            events.setdefault(row.source_url, {
+                "source_url": row.source_url,
+                "city": cities[vendor_id],
+                "event_day": parse_event_day(row.event_date),
+                "event_name": row.event_name or "",
+                "description": row.description,
+                "location": row.location,
+                "contact_phone": row.contact_phone,
+                "stall_info": row.stall_info,
+                "event_date": row.event_date,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+            links.append((vendor_id, row.source_url, created_at))
+        if not events:
+            continue
+
+        insert_missing_rows(db, Event, list(events.values()), ["source_url"])
+        ids = dict(db.execute(select(Event.source_url, Event.id).where(Event.source_url.in_(list(events)))).all())
+        existing = set(db.execute(
+            select(VendorEventLink.vendor_id, VendorEventLink.event_id).where(VendorEventLink.event_id.in_(list(ids.values())))
+        ).all())
+        missing = [
+            {"vendor_id": vendor_id, "event_id": ids[url], "created_at": created_at}
+            for vendor_id, url, created_at in links if (vendor_id, ids[url]) not in existing
+        ]
+        insert_missing_rows(db, VendorEventLink, missing, ["vendor_id", "event_id"])
+        counts["linked"] += len(missing)
+        linked_vendors.update(link["vendor_id"] for link in missing)
+
+    if linked_vendors:
+        bump_version(db, sorted(linked_vendors), VENDOR_EVENTS)
+    return counts
+
+
+def main(argv=None):
+    from db.database import SessionLocal, create_tables
+
+    parser = argparse.ArgumentParser(prog="python -m db.event_store", description="Maintain the shared event store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate-legacy", help="copy per-vendor events from vendor_events into events and vendor_event_links")
+    parser.parse_args(argv)
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        counts = migrate_legacy_events(db)
+        db.commit()
+        print(f"Linked {counts['linked']} of {counts['read']} legacy vendor events "
+              f"({counts['skipped']} skipped) in {time.perf_counter() - started:.2f}s")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from typing import Iterable, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from db.upsert import upsert_rows
+from models.inventory import InventoryBalance
+from models.stock_update import PurchaseTable, SellingTable
+
+
+def item_key(item_name: str) -> str:
+    """Balances are per item regardless of case and spacing: "Green  chilli" and "green chilli" are one item."""
+    return " ".join(str(item_name).split()).casefold()
+
+
+def _field(row, name: str):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def ledger_amount(kind: str, row) -> float:
+    # A purchase's price and a sale's total_price are both the amount of the whole line
+    return _field(row, "price" if kind == 'purchase' else "total_price")
+
+
+def apply_ledger_rows(db: Session, kind: str, rows: Iterable, sign: int = 1) -> None:
+    """
+    Fold purchase/sale rows (column dicts, ORM objects or RETURNING rows) into the vendors'
+    inventory balances: sign=1 for rows being written, -1 for rows being removed. Rows for the
+    same item are summed first, so a receipt with repeated items is still one upsert per item.
+    Runs in the caller's transaction; the caller commits together with the ledger write.
+    """
+    deltas = {}
+    for row in rows:
+        vendor_id = _field(row, "vendor_id")
+        name = _field(row, "item_name")
+        key = (vendor_id, item_key(name))
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = {
+                "vendor_id": vendor_id, "item_key": key[1], "item_name": " ".join(str(name).split()),
+                "qty_in": 0, "qty_out": 0, "spend": 0.0, "revenue": 0.0,
+            }
+        quantity = sign * _field(row, "quantity")
+        amount = sign * ledger_amount(kind, row)
+        if kind == 'purchase':
+            delta["qty_in"] += quantity
+            delta["spend"] += amount
+        else:
+            delta["qty_out"] += quantity
+            delta["revenue"] += amount
+
+    upsert_rows(
+        db, InventoryBalance, list(deltas.values()),
+        conflict_cols=("vendor_id", "item_key"),
+        increment_cols=("qty_in", "qty_out", "spend", "revenue"),
+        replace_cols=("item_name",) if sign > 0 else (),
+        extra_set={"updated_at": func.now()},
+    )
+
+
+def rebuild_inventory(db: Session, vendor_id: int) -> List[InventoryBalance]:
+    """Recompute a vendor's balances from the full ledgers (repair / backfill). The caller commits."""
+    db.query(InventoryBalance).filter(InventoryBalance.vendor_id == vendor_id).delete(synchronize_session=False)
+    for kind, model, amount in (
+        ('purchase', PurchaseTable, PurchaseTable.price),
+        ('selling', SellingTable, SellingTable.total_price),
+    ):
+        totals = (
+            db.query(
+                model.item_name,
+                func.sum(model.quantity).label("quantity"),
+                func.sum(amount).label("amount"),
+            )
+            .filter(model.vendor_id == vendor_id)
+            .group_by(model.item_name)
+            .all()
+        )
+        rows = [
+            {"vendor_id": vendor_id, "item_name": t.item_name, "quantity": t.quantity,
+             "price" if kind == 'purchase' else "total_price": t.amount}
+            for t in totals
+        ]
+        apply_ledger_rows(db, kind, rows)
+    db.flush()
+    return list_inventory(db, vendor_id)
+
+
+def list_inventory(db: Session, vendor_id: int) -> List[InventoryBalance]:
+    return (
+        db.query(InventoryBalance)
+        .filter(InventoryBalance.vendor_id == vendor_id)
+        .order_by(InventoryBalance.item_key)
+        .all()
+    )
@@ -0,0 +1,49 @@
+from typing import List
+
+from sqlalchemy import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from core.etag import LEDGER_COLLECTIONS, bump_version
+from db.inventory import apply_ledger_rows
+from db.rollups import apply_rollup_rows
+from models.stock_update import PurchaseTable, SellingTable
+
+# Ledger kind -> table; the keys match the receipt intents.
+LEDGER_MODELS = {
+    'purchase': PurchaseTable,
+    'selling': SellingTable,
+}
+
+
+def apply_ledger_aggregates(db: Session, kind: str, rows, sign: int = 1) -> None:
+    """
+    Keep everything derived from the ledgers (inventory balances, daily rollups, list ETags) in step with a
+    ledger write: sign=1 for rows being written, -1 for rows being removed. Call it in the same
+    transaction as the write, before commit.
+    """
+    apply_ledger_rows(db, kind, rows, sign)
+    apply_rollup_rows(db, kind, rows, sign)
+    bump_version(db, (row["vendor_id"] if isinstance(row, dict) else row.vendor_id for row in rows), LEDGER_COLLECTIONS[kind])
+
+
+def insert_ledger_rows(db: Session, kind: str, rows: List[dict], returning: bool = True) -> List[Row]:
+    """
+    Insert many purchase/sale rows with one multi-row INSERT ... RETURNING and return the
+    stored rows (id and server-side timestamps included) in the same order as `rows`.
+    Rows are plain column dicts, e.g. {"item_name", "quantity", "price" | "total_price",
+    "payment_method", "vendor_id"}. Inventory balances and rollups are updated in the same transaction.
+    With returning=False (bulk imports) the rows are sent as a plain batched executemany and
+    nothing is returned. The caller owns the transaction and commits.
+    """
+    if not rows:
+        return []
+    model = LEDGER_MODELS[kind]
+    if not returning:
+        db.execute(insert(model), rows)
+        apply_ledger_aggregates(db, kind, rows)
+        return []
+    stmt = insert(model).returning(*model.__table__.columns, sort_by_parameter_order=True)
+    records = db.execute(stmt, rows).all()
+    apply_ledger_aggregates(db, kind, records)
+    return records
@@ -0,0 +1,225 @@
+import argparse
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.inventory import item_key, ledger_amount
+from db.upsert import upsert_rows
+from models.rollups import LedgerDailyRollup
+from models.stock_update import ModeEnum, PurchaseTable, SellingTable
+
+LOCAL_TZ = ZoneInfo(settings.TIMEZONE)
+
+# Ledger kind -> (table, timestamp column)
+_LEDGERS = {
+    'purchase': (PurchaseTable, 'created_at'),
+    'selling': (SellingTable, 'date'),
+}
+
+REBUILD_CHUNK_SIZE = 1000
+
+
+def _field(row, name: str):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def local_day(ts: Optional[datetime]) -> date:
+    """The vendor-facing calendar day of a ledger timestamp. Naive timestamps (SQLite) are UTC."""
+    if ts is None:
+        # Rows not flushed yet get their timestamp from the database's now()
+        ts = datetime.now(timezone.utc)
+    elif ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(LOCAL_TZ).date()
+
+
+def apply_rollup_rows(db: Session, kind: str, rows: Iterable, sign: int = 1) -> None:
+    """
+    Fold purchase/sale rows into the daily rollups; sign=1 for rows being written, -1 for rows
+    being removed. Same contract as db.inventory.apply_ledger_rows: runs in the caller's transaction.
+    """
+    ts_field = _LEDGERS[kind][1]
+    deltas = {}
+    for row in rows:
+        vendor_id = _field(row, "vendor_id")
+        name = _field(row, "item_name")
+        day = local_day(_field(row, ts_field))
+        key = (vendor_id, day, item_key(name))
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = {
+                "vendor_id": vendor_id, "day": day, "kind": kind, "item_key": key[2],
+                "item_name": " ".join(str(name).split()),
+                "entries": 0, "quantity": 0, "amount": 0.0, "cash_amount": 0.0, "online_amount": 0.0,
+            }
+        amount = sign * ledger_amount(kind, row)
+        delta["entries"] += sign
+        delta["quantity"] += sign * _field(row, "quantity")
+        delta["amount"] += amount
+        if ModeEnum(_field(row, "payment_method")) == ModeEnum.Online:
+            delta["online_amount"] += amount
+        else:
+            delta["cash_amount"] += amount
+
+    upsert_rows(
+        db, LedgerDailyRollup, list(deltas.values()),
+        conflict_cols=("vendor_id", "day", "kind", "item_key"),
+        increment_cols=("entries", "quantity", "amount", "cash_amount", "online_amount"),
+        replace_cols=("item_name",) if sign > 0 else (),
+    )
+
+
+def rebuild_rollups(db: Session, vendor_id: Optional[int] = None) -> int:
+    """
+    Recompute the rollups (for one vendor, or everyone) from the full ledgers and return the
+    number of ledger rows folded in. Streams the ledgers in chunks; the caller commits.
+    """
+    query = db.query(LedgerDailyRollup)
+    if vendor_id is not None:
+        query = query.filter(LedgerDailyRollup.vendor_id == vendor_id)
+    query.delete(synchronize_session=False)
+
+    total = 0
+    for kind, (model, _) in _LEDGERS.items():
+        query = db.query(model)
+        if vendor_id is not None:
+            query = query.filter(model.vendor_id == vendor_id)
+        chunk = []
+        for record in query.order_by(model.id).yield_per(REBUILD_CHUNK_SIZE):
+            chunk.append(record)
+            if len(chunk) >= REBUILD_CHUNK_SIZE:
+                apply_rollup_rows(db, kind, chunk)
+                total += len(chunk)
+                chunk = []
+        apply_rollup_rows(db, kind, chunk)
+        total += len(chunk)
+    db.flush()
+    return total
+
+
+def rollup_query(db: Session, vendor_id: int, start: date, end: date, kind: Optional[str] = None):
+    """Rollup rows of a vendor for the inclusive day range [start, end]."""
+    query = db.query(LedgerDailyRollup).filter(
+        LedgerDailyRollup.vendor_id == vendor_id,
+        LedgerDailyRollup.day >= start,
+        LedgerDailyRollup.day <= end,
+    )
+    if kind is not None:
+        query = query.filter(LedgerDailyRollup.kind == kind)
+    return query
+
+
+def _totals_columns():
+    return (
+        func.sum(LedgerDailyRollup.entries).label("entries"),
+        func.sum(LedgerDailyRollup.quantity).label("quantity"),
+        func.sum(LedgerDailyRollup.amount).label("amount"),
+        func.sum(LedgerDailyRollup.cash_amount).label("cash_amount"),
+        func.sum(LedgerDailyRollup.online_amount).label("online_amount"),
+    )
+
+
+def _totals(row) -> dict:
+    return {
+        "entries": int(row.entries or 0),
+        "quantity": int(row.quantity or 0),
+        "amount": float(row.amount or 0.0),
+        "cash_amount": float(row.cash_amount or 0.0),
+        "online_amount": float(row.online_amount or 0.0),
+    }
+
+
+def summary(db: Session, vendor_id: int, start: date, end: date) -> dict:
+    """Totals per ledger kind for the range, plus revenue minus spend."""
+    rows = (
+        rollup_query(db, vendor_id, start, end)
+        .with_entities(LedgerDailyRollup.kind, *_totals_columns())
+        .group_by(LedgerDailyRollup.kind)
+        .all()
+    )
+    by_kind = {row.kind: _totals(row) for row in rows}
+    empty = {"entries": 0, "quantity": 0, "amount": 0.0, "cash_amount": 0.0, "online_amount": 0.0}
+    purchases = by_kind.get('purchase', empty)
+    sales = by_kind.get('selling', empty)
+    return {
+        "start": start,
+        "end": end,
+        "purchases": purchases,
+        "sales": sales,
+        "net": sales["amount"] - purchases["amount"],
+    }
+
+
+def daily_series(db: Session, vendor_id: int, start: date, end: date, kind: str) -> List[dict]:
+    rows = (
+        rollup_query(db, vendor_id, start, end, kind)
+        .with_entities(LedgerDailyRollup.day, *_totals_columns())
+        .group_by(LedgerDailyRollup.day)
+        .order_by(LedgerDailyRollup.day)
+        .all()
+    )
+    return [{"day": row.day, **_totals(row)} for row in rows]
+
+
+def weekly_series(db: Session, vendor_id: int, start: date, end: date, kind: str) -> List[dict]:
+    """Weeks (starting Monday) folded from the daily series; at most ~7x fewer rows than it."""
+    weeks = {}
+    for day in daily_series(db, vendor_id, start, end, kind):
+        week_start = day["day"] - timedelta(days=day["day"].weekday())
+        week = weeks.setdefault(week_start, {
+            "week_start": week_start, "entries": 0, "quantity": 0,
+            "amount": 0.0, "cash_amount": 0.0, "online_amount": 0.0,
+        })
+        for field in ("entries", "quantity", "amount", "cash_amount", "online_amount"):
+            week[field] += day[field]
+    return [weeks[week_start] for week_start in sorted(weeks)]
+
+
+def top_items(db: Session, vendor_id: int, start: date, end: date, kind: str, limit: int) -> List[dict]:
+    rows = (
+        rollup_query(db, vendor_id, start, end, kind)
+        .with_entities(LedgerDailyRollup.item_key, func.max(LedgerDailyRollup.item_name).label("item_name"), *_totals_columns())
+        .group_by(LedgerDailyRollup.item_key)
+        .order_by(func.sum(LedgerDailyRollup.amount).desc())
+        .limit(limit)
+        .all()
+    )
+    return [{"item_name": row.item_name, **_totals(row)} for row in rows]
+
+
+def main(argv=None):
+    from db.database import SessionLocal, create_tables
+    from db.inventory import rebuild_inventory
+    from models.vendor import Vendor
+
+    parser = argparse.ArgumentParser(prog="python -m db.rollups", description="Maintain the ledger rollup tables.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="recompute rollups (and inventory balances) from the ledgers")
+    rebuild.add_argument("--vendor-id", type=int, default=None, help="only this vendor (default: all)")
+    args = parser.parse_args(argv)
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        count = rebuild_rollups(db, args.vendor_id)
+        vendor_ids = [args.vendor_id] if args.vendor_id is not None else [v for (v,) in db.query(Vendor.id)]
+        for vendor_id in vendor_ids:
+            rebuild_inventory(db, vendor_id)
+        db.commit()
+        print(f"Rebuilt rollups from {count} ledger rows and inventory for {len(vendor_ids)} vendor(s) "
+              f"in {time.perf_counter() - started:.2f}s")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+from typing import Iterable, List
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+_ON_CONFLICT_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert,
+}
+
+
+def upsert_rows(db: Session, model, rows: List[dict], conflict_cols: Iterable[str],
+                increment_cols: Iterable[str] = (), replace_cols: Iterable[str] = (), extra_set: dict = None) -> None:
+    """
+    Insert `rows` into `model`, or fold them into the rows already there when `conflict_cols`
+    (a unique constraint) collide: increment_cols are added to the stored values, replace_cols
+    take the new values. extra_set is added to the UPDATE as-is (e.g. {"updated_at": func.now()}).
+    One statement on SQLite and Postgres; other databases fall back to a read-modify-write per row.
+    The caller owns the transaction and commits.
+    """
+    if not rows:
+        return
+    conflict_cols, increment_cols, replace_cols = list(conflict_cols), list(increment_cols), list(replace_cols)
+    make_insert = _ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+
+    if make_insert is not None:
+        table = model.__table__
+        stmt = make_insert(table)
+        set_ = {col: table.c[col] + stmt.excluded[col] for col in increment_cols}
+        set_.update({col: stmt.excluded[col] for col in replace_cols})
+        set_.update(extra_set or {})
+        db.execute(stmt.on_conflict_do_update(index_elements=conflict_cols, set_=set_), rows)
+        return
+
+    for row in rows:
+        existing = db.query(model).filter_by(**{col: row[col] for col in conflict_cols}).with_for_update().first()
+        if existing is None:
+            db.execute(insert(model), [row])
+            continue
+        for col in increment_cols:
+            setattr(existing, col, getattr(existing, col) + row[col])
+        for col in replace_cols:
+            setattr(existing, col, row[col])
+        for col, value in (extra_set or {}).items():
+            setattr(existing, col, value)
+    db.flush()
+
+
+def insert_missing_rows(db: Session, model, rows: List[dict], conflict_cols: Iterable[str]) -> None:
+    """
+    Insert the `rows` whose `conflict_cols` (a unique constraint) are not in `model` yet and leave
+    the existing ones alone (ON CONFLICT DO NOTHING). Drivers don't reliably report how many rows an
+    executemany inserted (asyncpg gives -1), so callers that need a count select the missing keys first.
+    The caller owns the transaction and commits.
+    """
+    if not rows:
+        return
+    conflict_cols = list(conflict_cols)
+    make_insert = _ON_CONFLICT_INSERTS.get(db.get_bind().dialect.name)
+
+    if make_insert is not None:
+        stmt = make_insert(model.__table__).on_conflict_do_nothing(index_elements=conflict_cols)
+        db.execute(stmt, rows)
+        return
+
+    for row in rows:
+        if db.query(model).filter_by(**{col: row[col] for col in conflict_cols}).first() is None:
+            db.execute(insert(model), [row])
+    db.flush()
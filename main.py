@@ -1,21 +1,25 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Depends, Response, Cookie
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Depends, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse
 from core.config import settings
-from routers import remainder, stock_update, vendor, whatsapp_remainder, event_router
-from db.database import create_tables, SessionLocal, engine, Base
-import os
+from routers import remainder, stock_update, vendor, whatsapp_remainder, event_router, receipt_jobs, inventory, analytics, ledger_export, ledger_import
+from db.database import create_tables, AsyncSessionLocal, async_engine, engine, read_engine, Base
 from routers.event_router import event_router 
-from sqlalchemy.orm import Session
-from models.stock_update import PurchaseTable, SellingTable, ModeEnum
-from models.vendor import Vendor
-import json
-from typing import Optional
-import uuid
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.auth import VendorSnapshot, get_current_vendor, listen_for_invalidations
+from typing import List
 from fastapi.staticfiles import StaticFiles
-from db.database import get_db
-from core.vision_ai import extract_text
-create_tables()
+from db.database import get_async_db
+from db.ledger import insert_ledger_rows
+from core.workers import shutdown_process_pool
+from core.http_fetcher import close_http_fetcher
+from core.ingest import ingest_upload
+from core.sse import event_stream, sse
+from core.receipts import (
+    INTENTS, ReceiptError, parse_receipt_payload, validate_items, build_row, record_to_item,
+    extract_receipt, remember_receipt, stream_receipt, validate_item
+)
+import asyncio
 app = FastAPI(
     title="INHACK `INDIAN HAWKERS`",
     description="An Application for Indian Street Food Sellers",
@@ -29,19 +33,38 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # The dashboard follows list pagination through X-Next-Cursor
+    expose_headers=["X-Next-Cursor", "X-Import-Summary"],
 )
 
-# Reuse get_session_id and get_current_vendor from stock_update.py
-def get_session_id(session_id: Optional[str] = Cookie(None)):
-    if not session_id:
-        session_id = str(uuid.uuid4())
-    return session_id
+@app.on_event("startup")
+def init_database():
+    # Not at import time: the process pool's spawned children re-import this module when it is run as a script
+    create_tables()
+
+@app.on_event("startup")
+async def start_session_listener():
+    # Session rotations in other worker processes reach this one's session cache through Redis
+    app.state.session_listener = asyncio.create_task(listen_for_invalidations())
+
+@app.on_event("shutdown")
+async def stop_session_listener():
+    app.state.session_listener.cancel()
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    shutdown_process_pool()
+
+@app.on_event("shutdown")
+async def close_databases():
+    # Pooled aiosqlite connections each hold a worker thread that would keep the process alive
+    await async_engine.dispose()
+    engine.dispose()
+    read_engine.dispose()
 
-async def get_current_vendor(session_id: str = Depends(get_session_id), db: Session = Depends(get_db)):
-    vendor = db.query(Vendor).filter(Vendor.session_id == session_id).first()
-    if not vendor:
-        raise HTTPException(status_code=401, detail="Vendor not authenticated")
-    return vendor
+@app.on_event("shutdown")
+async def close_http_clients():
+    await close_http_fetcher()
 
 @app.get('/', response_class=HTMLResponse)
 async def home():
@@ -52,191 +75,203 @@ async def home():
 async def upload_receipt(
     file: UploadFile = File(...),
     intent: str = Form(...),
-    vendor: Vendor = Depends(get_current_vendor),  # Add vendor dependency
-    db: Session = Depends(get_db)
+    vendor: VendorSnapshot = Depends(get_current_vendor),  # Add vendor dependency
+    db: AsyncSession = Depends(get_async_db)
 ):
-    temp_path = None
-    
     try:
-        # Validate file type
-        if not file.content_type or not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail='Invalid file type. Please upload an image file.')
-
         # Validate intent
-        if intent not in ['purchase', 'selling']:
+        if intent not in INTENTS:
             raise HTTPException(status_code=400, detail='Invalid intent. Must be "purchase" or "selling".')
 
-        # Create temp file with unique name
-        temp_path = f"temp_{uuid.uuid4()}_{file.filename}"
-        
-        # Save uploaded file
+        # Read, size-check, hash and encode the upload in memory, then extract, parse and
+        # validate the items (same photo + intent already extracted skips the model)
         try:
-            with open(temp_path, 'wb') as f:
-                content = await file.read()
-                if not content:
-                    raise HTTPException(status_code=400, detail='Empty file uploaded.')
-                f.write(content)
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f'Failed to save uploaded file: {str(e)}')
-
-        # Extract text using AI
-        try:
-            json_str = extract_text(temp_path, intent)
-            raw = (json_str or "").strip()
-
-            if not raw:
-                raise HTTPException(status_code=502, detail="AI service returned empty response")
+            image = await ingest_upload(file)
+            raw, cached = await extract_receipt(image, intent)
+            items = validate_items(parse_receipt_payload(raw, intent))
+        except ReceiptError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
 
-        except Exception as e:
-            raise HTTPException(status_code=502, detail=f"AI processing failed: {str(e)}")
-
-        # Parse JSON response
-        try:
-            payload = json.loads(raw)
-        except json.JSONDecodeError as e:
-            raise HTTPException(status_code=502, detail=f"Invalid JSON from AI service: {str(e)}")
-
-        # Validate JSON structure
-        if not isinstance(payload, dict):
-            raise HTTPException(status_code=502, detail="AI response is not a valid JSON object")
-        
-        if payload.get("intent") != intent:
-            raise HTTPException(status_code=502, detail=f"Intent mismatch. Expected: {intent}, Got: {payload.get('intent')}")
-        
-        if "items" not in payload or not isinstance(payload["items"], list):
-            raise HTTPException(status_code=502, detail="No 'items' list found in AI response")
-
-        items = payload["items"]
-        
-        if not items:
-            raise HTTPException(status_code=400, detail="No items found in the receipt")
-
-        # Database operations
-        records = []
-        
-        for idx, item in enumerate(items):
-            try:
-                # Validate item structure
-                required_fields = ["item_name", "quantity", "price", "payment_method"]
-                for field in required_fields:
-                    if field not in item:
-                        raise ValueError(f"Missing required field '{field}' in item {idx + 1}")
-
-                # Validate and convert data types
-                item_name = str(item["item_name"]).strip()
-                if not item_name:
-                    raise ValueError(f"Empty item name in item {idx + 1}")
-
-                try:
-                    quantity = int(float(item["quantity"]))
-                    if quantity <= 0:
-                        raise ValueError(f"Invalid quantity in item {idx + 1}: {quantity}")
-                except (ValueError, TypeError):
-                    raise ValueError(f"Invalid quantity format in item {idx + 1}: {item['quantity']}")
-
-                try:
-                    price = float(item["price"])
-                    if price < 0:
-                        raise ValueError(f"Invalid price in item {idx + 1}: {price}")
-                except (ValueError, TypeError):
-                    raise ValueError(f"Invalid price format in item {idx + 1}: {item['price']}")
-
-                # Validate payment method
-                payment_method = str(item["payment_method"]).strip()
-                if payment_method not in ["Cash", "online"]:
-                    payment_method = "Cash"
-
-                # Create database record
-                if intent == 'purchase':
-                    record = PurchaseTable(
-                        item_name=item_name,
-                        quantity=quantity,
-                        price=price,
-                        payment_method=ModeEnum(payment_method),
-                        vendor_id=vendor.id  # Set vendor_id from authenticated vendor
-                    )
-                else:  # selling
-                    record = SellingTable(
-                        item_name=item_name,
-                        quantity=quantity,
-                        total_price=price,
-                        payment_method=ModeEnum(payment_method),
-                        vendor_id=vendor.id  # Set vendor_id from authenticated vendor
-                    )
-                
-                db.add(record)
-                records.append(record)
-                
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=str(e))
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Error processing item {idx + 1}: {str(e)}")
-
-        # Commit all records
+        # Database operations: one INSERT ... RETURNING gives back IDs and timestamps.
+        # The ledger layer is sync; run_sync drives it over the async connection.
         try:
-            db.commit()
-            
-            # Refresh to get IDs and timestamps
-            for record in records:
-                db.refresh(record)
-                
+            records = await db.run_sync(insert_ledger_rows, intent, [build_row(intent, item, vendor.id) for item in items])
+            await db.commit()
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+        if not cached:
+            await remember_receipt(image, intent, raw)
+
         # Convert records to dict format for response
-        response_items = []
-        for record in records:
-            if intent == 'purchase':
-                response_items.append({
-                    "id": record.id,
-                    "item_name": record.item_name,
-                    "quantity": record.quantity,
-                    "price": record.price,
-                    "payment_method": record.payment_method.value,
-                    "created_at": record.created_at.isoformat() if hasattr(record, 'created_at') else None,
-                    "vendor_id": record.vendor_id  # Include vendor_id to match schema
-                })
-            else:
-                response_items.append({
-                    "id": record.id,
-                    "item_name": record.item_name,
-                    "quantity": record.quantity,
-                    "price": record.total_price,
-                    "payment_method": record.payment_method.value,
-                    "created_at": record.date.isoformat() if hasattr(record, 'date') else None,
-                    "vendor_id": record.vendor_id  # Include vendor_id to match schema
-                })
+        response_items = [record_to_item(intent, record) for record in records]
 
         return {
             "message": "Receipt processed successfully",
             "items": response_items,
-            "count": len(response_items)
+            "count": len(response_items),
+            "cached": cached,
+            "preprocessing": image.preprocessing
         }
 
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
-    
-    finally:
-        if temp_path and os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except Exception:
-                pass
-        if db:
-            try:
-                db.close()
-            except Exception:
-                pass
+
+@app.post('/api/upload-receipt/stream')
+async def upload_receipt_stream(
+    file: UploadFile = File(...),
+    intent: str = Form(...),
+    vendor: VendorSnapshot = Depends(get_current_vendor)
+):
+    """
+    Streaming version of /api/upload-receipt/ (text/event-stream). Emits an `item` event for
+    every line item as soon as the model finishes writing it, then `done` with the saved rows
+    (same shape as the non-streaming response) or `error`. Items are staged as they arrive
+    and committed together once the complete document has passed the strict checks.
+    """
+    if intent not in INTENTS:
+        raise HTTPException(status_code=400, detail='Invalid intent. Must be "purchase" or "selling".')
+    try:
+        image = await ingest_upload(file)
+    except ReceiptError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    vendor_id = vendor.id
+
+    async def events():
+        # The request-scoped session is gone by the time the body streams, so use our own
+        db = AsyncSessionLocal()
+        staged = []
+        try:
+            async for kind, value in stream_receipt(image, intent):
+                if kind == "done":
+                    raw, cached = value
+                    break
+                item = validate_item(value, len(staged))
+                staged.append(build_row(intent, item, vendor_id))
+                yield sse("item", {"index": len(staged) - 1, **item})
+
+            if len(validate_items(parse_receipt_payload(raw, intent))) != len(staged):
+                raise ReceiptError("AI response items could not all be read", 502)
+
+            records = await db.run_sync(insert_ledger_rows, intent, staged)
+            await db.commit()
+            if not cached:
+                await remember_receipt(image, intent, raw)
+
+            response_items = [record_to_item(intent, record) for record in records]
+            yield sse("done", {
+                "message": "Receipt processed successfully",
+                "items": response_items,
+                "count": len(response_items),
+                "cached": cached,
+                "preprocessing": image.preprocessing
+            })
+        except ReceiptError as e:
+            await db.rollback()
+            yield sse("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            await db.rollback()
+            yield sse("error", {"status_code": 500, "detail": f"Unexpected error: {str(e)}"})
+        finally:
+            await db.close()
+
+    return event_stream(events())
+
+@app.post('/api/upload-receipts/')
+async def upload_receipts(
+    files: List[UploadFile] = File(...),
+    intent: str = Form(...),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Batch version of /api/upload-receipt/: every file is extracted concurrently (at most
+    RECEIPT_BATCH_CONCURRENCY at a time), and the items of all receipts that validated are
+    written in a single transaction. Each file gets its own success/error entry.
+    """
+    if intent not in INTENTS:
+        raise HTTPException(status_code=400, detail='Invalid intent. Must be "purchase" or "selling".')
+    if not files:
+        raise HTTPException(status_code=400, detail='No files uploaded.')
+    if len(files) > settings.RECEIPT_BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f'Too many files. At most {settings.RECEIPT_BATCH_MAX_FILES} receipts per batch.')
+
+    semaphore = asyncio.Semaphore(settings.RECEIPT_BATCH_CONCURRENCY)
+
+    async def process(file: UploadFile) -> dict:
+        result = {"filename": file.filename}
+        try:
+            image = await ingest_upload(file)
+            async with semaphore:
+                raw, cached = await extract_receipt(image, intent)
+            result.update(items=validate_items(parse_receipt_payload(raw, intent)),
+                          image=image, raw=raw, cached=cached)
+        except ReceiptError as e:
+            result.update(status="error", status_code=e.status_code, error=e.detail)
+        except Exception as e:
+            result.update(status="error", status_code=500, error=f"Unexpected error: {str(e)}")
+        return result
+
+    results = await asyncio.gather(*(process(file) for file in files))
+
+    # One INSERT ... RETURNING and one commit for every receipt that validated
+    ok = [r for r in results if "error" not in r]
+    if ok:
+        try:
+            records = await db.run_sync(insert_ledger_rows, intent, [
+                build_row(intent, item, vendor.id) for r in ok for item in r["items"]
+            ])
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        # Rows come back in input order; hand each receipt its slice
+        offset = 0
+        for r in ok:
+            r["records"] = records[offset:offset + len(r["items"])]
+            offset += len(r["items"])
+
+    response = []
+    for r in results:
+        if "error" in r:
+            response.append({k: r[k] for k in ("filename", "status", "status_code", "error")})
+            continue
+        if not r["cached"]:
+            await remember_receipt(r["image"], intent, r["raw"])
+        items = [record_to_item(intent, record) for record in r["records"]]
+        response.append({
+            "filename": r["filename"],
+            "status": "ok",
+            "items": items,
+            "count": len(items),
+            "cached": r["cached"],
+            "preprocessing": r["image"].preprocessing
+        })
+
+    return {
+        "message": f"Processed {len(ok)} of {len(results)} receipts",
+        "succeeded": len(ok),
+        "failed": len(results) - len(ok),
+        "results": response
+    }
 
 app.include_router(stock_update.router, prefix=settings.API_PREFIX)
 app.include_router(remainder.router, prefix=settings.API_PREFIX)
 app.include_router(vendor.router, prefix=settings.API_PREFIX)
 app.include_router(whatsapp_remainder.router, prefix=settings.API_PREFIX)
 app.include_router(event_router, prefix=settings.API_PREFIX)
+app.include_router(receipt_jobs.router, prefix=settings.API_PREFIX)
+app.include_router(inventory.router, prefix=settings.API_PREFIX)
+app.include_router(analytics.router, prefix=settings.API_PREFIX)
+app.include_router(ledger_export.router, prefix=settings.API_PREFIX)
+app.include_router(ledger_import.router, prefix=settings.API_PREFIX)
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    # Hand over to `python -m uvicorn` instead of serving from this script: spawned worker-pool
+    # children re-import a script __main__ (this whole app), but skip a package's __main__ module.
+    import os
+    import sys
+    os.execv(sys.executable, [sys.executable, "-m", "uvicorn", "main:app", "--host", "0.0.0.0", "--port", "8000", "--reload"])
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Date, Text, ForeignKey, Index, UniqueConstraint
 from datetime import datetime
 from db.database import Base# or your Base class
 
@@ -15,3 +15,55 @@ class VendorEvent(Base):
     event_date = Column(String, nullable=True)
     source_url = Column(String, nullable=True, unique=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Event(Base):
+    '''
+    An event found by discovery, stored once per source URL for the whole city it was found for
+    (see db.event_store). Vendors are attached through VendorEventLink.
+    '''
+    __tablename__ = "events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    city = Column(String, nullable=False)  # normalized, see db.event_store.city_key
+    event_day = Column(Date, nullable=True)  # parsed from event_date when it is a recognizable date
+    event_name = Column(String, nullable=False)
+    description = Column(Text)
+    location = Column(String)
+    contact_phone = Column(String, nullable=True)
+    stall_info = Column(String)
+    event_date = Column(String, nullable=True)  # as extracted from the page
+    source_url = Column(String, nullable=False, unique=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_events_city_event_day', 'city', 'event_day'),
+    )
+
+
+class VendorEventLink(Base):
+    __tablename__ = "vendor_event_links"
+
+    id = Column(Integer, primary_key=True, index=True)
+    vendor_id = Column(Integer, ForeignKey('vendors.id'), nullable=False)
+    event_id = Column(Integer, ForeignKey('events.id'), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('vendor_id', 'event_id', name='uq_vendor_event_link'),
+    )
+
+
+class EventDiscoveryRun(Base):
+    '''
+    The last discovery run for a city. While it is younger than EVENT_CITY_REFRESH_SECONDS,
+    every vendor in the city is served from the stored events instead of searching again.
+    '''
+    __tablename__ = "event_discovery_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    city = Column(String, nullable=False, unique=True)
+    vendor_id = Column(Integer, ForeignKey('vendors.id'), nullable=True)  # the vendor whose request ran it
+    events_found = Column(Integer, nullable=False, default=0)
+    finished_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, UniqueConstraint
+from db.database import Base
+
+class CollectionVersion(Base):
+    '''
+    A counter per vendor and collection ("purchases", "sales", "reminders", "vendor-events"),
+    bumped in the same transaction as every write to that collection. The list endpoints
+    derive their ETags from it (see core.etag), so an unchanged list costs one primary-key
+    lookup instead of the list query.
+    '''
+    __tablename__ = 'collection_versions'
+
+    id = Column(Integer, primary_key=True, index=True)
+    vendor_id = Column(Integer, ForeignKey('vendors.id'), nullable=False)
+    collection = Column(String(32), nullable=False)
+    version = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('vendor_id', 'collection', name='uq_collection_version_vendor'),
+    )
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy.sql import func
+from db.database import Base
+
+class InventoryBalance(Base):
+    '''
+    Running per-vendor, per-item totals over the purchase and selling ledgers, kept up to date
+    in the same transaction as every ledger write (see db.inventory), so reading stock on hand
+    costs one row per item instead of a scan of the vendor's whole history.
+    '''
+    __tablename__ = 'inventory_balances'
+
+    id = Column(Integer, primary_key=True, index=True)
+    vendor_id = Column(Integer, ForeignKey('vendors.id'), nullable=False)
+    item_key = Column(String, nullable=False)  # normalized item_name, see db.inventory.item_key
+    item_name = Column(String, nullable=False)  # display name, as last written
+    qty_in = Column(Integer, nullable=False, default=0)
+    qty_out = Column(Integer, nullable=False, default=0)
+    spend = Column(Float, nullable=False, default=0.0)
+    revenue = Column(Float, nullable=False, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('vendor_id', 'item_key', name='uq_inventory_vendor_item'),
+    )
+
+    @property
+    def on_hand(self) -> int:
+        return self.qty_in - self.qty_out
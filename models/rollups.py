@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Date, UniqueConstraint
+from db.database import Base
+
+class LedgerDailyRollup(Base):
+    '''
+    Pre-aggregated purchase/sale totals per vendor, local day (settings.TIMEZONE), ledger kind and item,
+    maintained incrementally with every ledger write (see db.rollups). Dashboards and date-range
+    summaries read these instead of scanning purchase_table / selling_table.
+    '''
+    __tablename__ = 'ledger_daily_rollups'
+
+    id = Column(Integer, primary_key=True, index=True)
+    vendor_id = Column(Integer, ForeignKey('vendors.id'), nullable=False)
+    day = Column(Date, nullable=False)
+    kind = Column(String(10), nullable=False)  # 'purchase' | 'selling'
+    item_key = Column(String, nullable=False)  # normalized item_name, see db.inventory.item_key
+    item_name = Column(String, nullable=False)
+    entries = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0.0)
+    cash_amount = Column(Float, nullable=False, default=0.0)
+    online_amount = Column(Float, nullable=False, default=0.0)
+
+    # Leading (vendor_id, day) also serves the date-range scans in routers/analytics.py
+    __table_args__ = (
+        UniqueConstraint('vendor_id', 'day', 'kind', 'item_key', name='uq_rollup_vendor_day_kind_item'),
+    )
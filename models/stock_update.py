@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Enum, Index
 from sqlalchemy.sql import func
 from db.database import Base
 import enum
@@ -21,6 +21,11 @@ class PurchaseTable(Base):
     payment_method = Column(Enum(ModeEnum), nullable=False)
     vendor_id = Column(Integer, ForeignKey('vendors.id'), nullable=False)  # Add vendor_id
 
+    # Serves the newest-first, per-vendor keyset pagination in /purchases/
+    __table_args__ = (
+        Index('ix_purchase_vendor_created_at', vendor_id, created_at.desc(), id.desc()),
+    )
+
 class SellingTable(Base):
     '''
     This Table will be storing the details like the item/goods sold by the vendor to the consumer.
@@ -35,6 +40,11 @@ class SellingTable(Base):
     payment_method = Column(Enum(ModeEnum), nullable=False)
     vendor_id = Column(Integer, ForeignKey('vendors.id'), nullable=False)  # Add vendor_id
 
+    # Serves the newest-first, per-vendor keyset pagination in /sales/
+    __table_args__ = (
+        Index('ix_selling_vendor_date', vendor_id, date.desc(), id.desc()),
+    )
+
 
 # # Purchase_table
 # #     ID 
@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from core.auth import VendorSnapshot, get_current_vendor
+from db.database import get_read_db
+from db.rollups import LOCAL_TZ, daily_series, summary, top_items, weekly_series
+
+router = APIRouter()
+
+# -------------------------------
+# ANALYTICS Endpoints (served from the daily rollups)
+# prefix: /analytics
+# -------------------------------
+analytics_router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366 * 2
+KINDS = ['purchase', 'selling']
+
+def date_range(start: Optional[date] = None, end: Optional[date] = None) -> tuple:
+    # Inclusive local days; defaults to the last 30 days
+    end = end or datetime.now(LOCAL_TZ).date()
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must be on or before end")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_RANGE_DAYS} days")
+    return start, end
+
+def check_kind(kind: str) -> str:
+    if kind not in KINDS:
+        raise HTTPException(status_code=400, detail='Invalid kind. Must be "purchase" or "selling".')
+    return kind
+
+@analytics_router.get("/summary")
+def get_summary(
+    days: tuple = Depends(date_range),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_read_db)
+):
+    return summary(db, vendor.id, *days)
+
+@analytics_router.get("/daily")
+def get_daily(
+    kind: str = Query('selling'),
+    days: tuple = Depends(date_range),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_read_db)
+):
+    return daily_series(db, vendor.id, *days, check_kind(kind))
+
+@analytics_router.get("/weekly")
+def get_weekly(
+    kind: str = Query('selling'),
+    days: tuple = Depends(date_range),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_read_db)
+):
+    return weekly_series(db, vendor.id, *days, check_kind(kind))
+
+@analytics_router.get("/items")
+def get_top_items(
+    kind: str = Query('selling'),
+    limit: int = Query(10, ge=1, le=100),
+    days: tuple = Depends(date_range),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_read_db)
+):
+    return top_items(db, vendor.id, *days, check_kind(kind), limit)
+
+router.include_router(analytics_router)
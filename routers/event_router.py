@@ -1,20 +1,22 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 import asyncio
-import json
-import re
-from tavily import TavilyClient
-from bs4 import BeautifulSoup
-import requests
-from models.VendorEvent import VendorEvent        
-from schemas.Vendor_Event import VendorEventRead  
+from contextlib import asynccontextmanager
+from tavily import AsyncTavilyClient
 
 from models.vendor import Vendor
-from models.VendorEvent import VendorEvent
-from db.database import get_db  # Assume this function provides the database session
+from db.database import get_async_db
+from db.event_store import city_key, get_run, link_city_events, run_is_fresh, store_discovery_run, vendor_events
+from core.cache import TieredCache, redis_cache_url
+from core.config import settings
+from core.etag import VENDOR_EVENTS, not_modified
+from core.event_extraction import DEFAULT_DATE, extract_location, extract_page_details
+from core.http_fetcher import get_http_fetcher
+from core.rate_limit import TokenBucket
+from core.workers import run_in_process
 
 # Pydantic models for API request and response
 class EventResponse(BaseModel):
@@ -32,84 +34,173 @@ class VendorEventsRequest(BaseModel):
     radius_km: Optional[int] = 50
     max_results: Optional[int] = 10
 
+# Tavily answers keyed by normalized query + domain list; vendors in the same city ask near-identical questions
+search_cache = TieredCache(
+    namespace="tavily",
+    ttl_seconds=settings.EVENT_SEARCH_CACHE_TTL_SECONDS,
+    max_entries=settings.EVENT_SEARCH_CACHE_MAX_ENTRIES,
+    redis_url=redis_cache_url(),
+)
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+def search_cache_key(query: str, domains: List[str]) -> str:
+    return f"{normalize_query(query)}|{','.join(sorted(domains))}"
+
+
+class EventDiscoveryError(Exception):
+    """Raised when a discovery run got no answer from any search (e.g. Tavily is down)."""
+
+
+# Results below this score are dropped at discovery time
+MIN_RELEVANCE = 8
+
+
+def relevance_score(text: str, location: str, business_info: str = "") -> int:
+    """Calculate relevance score of an event text for a location and, when given, a vendor's business."""
+    text = text.lower()
+    location = location.lower()
+    score = 0
+    vendor_keywords = ['vendor', 'stall', 'booth', 'food vendor', 'registration', 'application']
+    score += sum(6 for keyword in vendor_keywords if keyword in text)  # Increased weight for vendor keywords
+    event_keywords = ['festival', 'fair', 'celebration', 'fest', 'market', 'event']
+    score += sum(4 for keyword in event_keywords if keyword in text)  # Increased weight for event keywords
+    if location in text:
+        score += 15  # Higher weight for exact location match
+    elif any(word.strip() and word.strip() in text for word in location.split(',')):
+        score += 8  # Partial location match
+    business_words = [word for word in business_info.lower().split() if len(word) > 3]
+    score += sum(3 for word in business_words if word in text)  # Increased weight for business keywords
+    if any(year in text for year in ['2024', '2025', '2026']):
+        score += 5  # Include 2026 for future-proofing
+    return score
+
+
+def rank_for_vendor(events: list, vendor: Vendor) -> list:
+    """Order a city's stored events by relevance to one vendor's location and business; soonest first on ties."""
+    scored = [
+        (relevance_score(f"{e.event_name} {e.description or ''} {e.location or ''}", vendor.Location, vendor.BusinessInfo), e)
+        for e in events
+    ]
+    scored = [(score, e) for score, e in scored if score >= MIN_RELEVANCE]
+    # Stable sort keeps vendor_events' date order among equally relevant events
+    scored.sort(key=lambda pair: -pair[0])
+    return [e for _, e in scored]
+
+
 # Event discovery service class
 class EventDiscoveryService:
+    # Listing sites worth searching; passed to every Tavily query
+    EVENT_DOMAINS = [
+        "eventbrite.com", "meetup.com", "timeout.com",
+        "allevents.in", "10times.com", "eventful.com",
+        "localevents.com", "citygov.com"
+    ]
+
     def __init__(self, tavily_api_key: str):
-        self.tavily_client = TavilyClient(api_key=tavily_api_key)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
-
-    async def find_vendor_events(self, vendor: Vendor, radius_km: int = 50, max_results: int = 10) -> List[EventResponse]:
-        """Find events for a specific vendor based on their location and business info."""
-        search_queries = self._generate_search_queries(vendor, radius_km)
-        all_events = []
-        for query in search_queries:
-            try:
-                results = self.tavily_client.search(
-                    query=query,
-                    search_depth="advanced",
-                    max_results=5,
-                    include_domains=[
-                        "eventbrite.com", "meetup.com", "timeout.com",
-                        "allevents.in", "10times.com", "eventful.com",
-                        "localevents.com", "citygov.com"
-                    ]
-                )
-                for result in results.get('results', []):
-                    event = await self._process_event_result(result, vendor)
-                    if event:
-                        all_events.append(event)
-                await asyncio.sleep(0.5)  # Reduced rate limit delay for better performance
-            except Exception as e:
-                print(f"Search error for query '{query}': {e}")
-                continue
-        unique_events = self._deduplicate_and_filter_events(all_events, vendor)
+        self.tavily_client = AsyncTavilyClient(api_key=tavily_api_key)
+        # Shared by every request in the process, so concurrent discoveries stay under Tavily's limits together
+        self.search_semaphore = asyncio.Semaphore(settings.EVENT_SEARCH_CONCURRENCY)
+        self.search_bucket = TokenBucket(settings.EVENT_SEARCH_RATE_PER_SECOND, settings.EVENT_SEARCH_BURST)
+
+    async def find_city_events(self, city: str, radius_km: int = 50, max_results: int = 50) -> List[EventResponse]:
+        """
+        Find events in a city. The queries and relevance filter use only the city, so one run
+        serves every vendor there; each vendor's own relevance is applied when reading (rank_for_vendor).
+        All queries run concurrently (bounded by EVENT_SEARCH_CONCURRENCY and the token bucket);
+        whatever has been found when EVENT_DISCOVERY_DEADLINE_SECONDS runs out is returned.
+        Raises EventDiscoveryError when no query got an answer, so an outage isn't stored as an empty city.
+        """
+        search_queries = self._generate_search_queries(city, radius_km)
+        # One list per query, filled as results are processed, so a query cut off by the deadline keeps what it had
+        found = [[] for _ in search_queries]
+        # url -> fetch task, so a page returned by several queries is downloaded once per run
+        pages = {}
+        tasks = [
+            asyncio.create_task(self._search_query(query, city, found[i], pages))
+            for i, query in enumerate(search_queries)
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=settings.EVENT_DISCOVERY_DEADLINE_SECONDS)
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+            print(f"Event discovery deadline hit: {len(pending)} of {len(tasks)} queries unfinished")
+
+        # A query counts as answered once Tavily (or the search cache) returned, even with no results
+        if not any(not task.cancelled() and task.exception() is None and task.result() for task in done):
+            raise EventDiscoveryError(f"No search for '{city}' succeeded")
+
+        # Keep query order so deduplication prefers the same events regardless of timing
+        all_events = [event for events in found for event in events if event]
+        unique_events = self._deduplicate_and_filter_events(all_events, city)
         return unique_events[:max_results]
 
-    def _generate_search_queries(self, vendor: Vendor, radius_km: int) -> List[str]:
-        """Generate targeted search queries based on vendor info with refined location and business info."""
-        location = vendor.Location.lower().strip()
-        business_type = vendor.BusinessInfo.lower().strip()
-        city = location.split(',')[-1].strip() if ',' in location else location
+    async def _search_query(self, query: str, city: str, events: List[Optional[EventResponse]], pages: dict) -> bool:
+        """
+        Run one Tavily search and fill `events` with its results, fetching their pages concurrently.
+        Returns whether the search itself succeeded.
+        """
+        try:
+            results = await self._search(query)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Search error for query '{query}': {e}")
+            return False
+        # One slot per result keeps Tavily's ranking no matter which page arrives first
+        events.extend([None] * len(results))
+
+        async def process(slot: int, result: dict) -> None:
+            events[slot] = await self._process_event_result(result, city, pages)
+
+        await asyncio.gather(*(process(slot, result) for slot, result in enumerate(results)))
+        return True
+
+    async def _search(self, query: str) -> List[dict]:
+        """Tavily results for a query, from the search cache when another vendor asked the same thing recently."""
+        query = normalize_query(query)
+        key = search_cache_key(query, self.EVENT_DOMAINS)
+        results = await search_cache.get(key)
+        if results is not None:
+            return results
+        async with self.search_semaphore:
+            await self.search_bucket.acquire()
+            response = await self.tavily_client.search(
+                query=query,
+                search_depth="advanced",
+                max_results=5,
+                include_domains=self.EVENT_DOMAINS
+            )
+        results = response.get('results', [])
+        await search_cache.set(key, results)
+        return results
 
-        # Base queries with precise location and business context
+    def _generate_search_queries(self, city: str, radius_km: int) -> List[str]:
+        """Search queries for a city. Nothing vendor-specific goes in, so every vendor there shares the results."""
         queries = [
             f"upcoming food festivals {city} vendor opportunities 2024 2025",
-            f"street food events {location} vendor registration",
+            f"street food events {city} vendor registration",
             f"local markets {city} food stalls near me",
-            f"community events {location} food vendors",
-            f"{business_type} festivals {city} vendor application"
+            f"community events {city} food vendors",
+            # The kinds of business the vendors here run: street food, drinks and campus events
+            f"street food festival {city} vendor booth",
+            f"food truck events {city}",
+            f"summer festivals {city} beverage vendors",
+            f"outdoor markets {city} drink stalls",
+            f"college fest {city} food vendors",
         ]
 
-        # Business-specific query enhancements
-        if any(word in business_type for word in ['vada pav', 'snacks', 'street food']):
-            queries.extend([
-                f"street food festival {city} vendor booth {business_type}",
-                f"food truck events {location} {business_type}",
-                f"cultural food events {city} {business_type} stalls"
-            ])
-        if any(word in business_type for word in ['juice', 'drinks', 'beverages']):
-            queries.extend([
-                f"summer festivals {city} beverage vendors {business_type}",
-                f"outdoor markets {location} drink stalls",
-                f"food and drink events {city} {business_type}"
-            ])
-        if any(word in business_type for word in ['college', 'university', 'student']):
-            queries.extend([
-                f"college fest {city} food vendors {business_type}",
-                f"university events {location} vendor registration",
-                f"student festivals {city} {business_type} stalls"
-            ])
-
         # Add radius-based query for nearby locations
         if radius_km > 0:
-            queries.append(f"food events near {location} within {radius_km}km vendor opportunities")
+            queries.append(f"food events near {city} within {radius_km}km vendor opportunities")
 
         return queries
 
-    async def _process_event_result(self, result: dict, vendor: Vendor) -> Optional[EventResponse]:
+    async def _process_event_result(self, result: dict, city: str, pages: Optional[dict] = None) -> Optional[EventResponse]:
         """Process a single search result into an event."""
         try:
             url = result.get('url', '')
@@ -119,10 +210,10 @@ class EventDiscoveryService:
                 return None
             if any(domain in url.lower() for domain in ['facebook.com', 'instagram.com', 'twitter.com']):
                 return None
-            relevance_score = self._calculate_relevance_score(title, content, vendor)
-            if relevance_score < 8:  # Increased threshold for better quality
+            score = relevance_score(title + " " + content, city)
+            if score < MIN_RELEVANCE:  # Increased threshold for better quality
                 return None
-            event_details = await self._extract_event_details(url, title, content)
+            event_details = await self._extract_event_details(url, title, content, pages)
             if not event_details:
                 return None
             return EventResponse(
@@ -138,98 +229,31 @@ class EventDiscoveryService:
             print(f"Error processing event result: {e}")
             return None
 
-    def _calculate_relevance_score(self, title: str, content: str, vendor: Vendor) -> int:
-        """Calculate relevance score for the vendor with enhanced location and business matching."""
-        text = (title + " " + content).lower()
-        score = 0
-        vendor_keywords = ['vendor', 'stall', 'booth', 'food vendor', 'registration', 'application']
-        score += sum(6 for keyword in vendor_keywords if keyword in text)  # Increased weight for vendor keywords
-        event_keywords = ['festival', 'fair', 'celebration', 'fest', 'market', 'event']
-        score += sum(4 for keyword in event_keywords if keyword in text)  # Increased weight for event keywords
-        if vendor.Location.lower() in text:
-            score += 15  # Higher weight for exact location match
-        elif any(word in text for word in vendor.Location.lower().split(',')):
-            score += 8  # Partial location match
-        business_words = [word for word in vendor.BusinessInfo.lower().split() if len(word) > 3]
-        score += sum(3 for word in business_words if word in text)  # Increased weight for business keywords
-        if any(year in text for year in ['2024', '2025', '2026']):
-            score += 5  # Include 2026 for future-proofing
-        return score
-
-    async def _extract_event_details(self, url: str, title: str, content: str) -> Optional[dict]:
-        """Extract detailed event information using web scraping with improved location extraction."""
+    async def _fetch_page(self, url: str, pages: Optional[dict]) -> bytes:
+        if pages is None:
+            return await get_http_fetcher().fetch(url)
+        if url not in pages:
+            pages[url] = asyncio.ensure_future(get_http_fetcher().fetch(url))
+        return await pages[url]
+
+    async def _extract_event_details(self, url: str, title: str, content: str, pages: Optional[dict] = None) -> Optional[dict]:
+        """Extract detailed event information from the event page; parsing runs on the worker pool."""
+        description = content[:250] + "..." if len(content) > 250 else content
         try:
-            response = self.session.get(url, timeout=8)  # Reduced timeout for faster processing
-            response.raise_for_status()
-            soup = BeautifulSoup(response.content, 'html.parser')
-            phone_pattern = r'(\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})'
-            phone_matches = re.findall(phone_pattern, soup.get_text())
-            phone = phone_matches[0] if phone_matches else None
-            date = self._extract_date_from_text(soup.get_text())
-            location = self._extract_location_from_content(content, soup.get_text())
-            stall_info = self._extract_stall_info(soup.get_text(), content)
-            return {
-                'name': title,
-                'description': content[:250] + "..." if len(content) > 250 else content,  # Extended description length
-                'location': location,
-                'phone': phone,
-                'date': date,
-                'stall_info': stall_info
-            }
-        except Exception as e:
-            return {
-                'name': title,
-                'description': content[:250] + "..." if len(content) > 250 else content,
-                'location': self._extract_location_from_content(content, ""),
+            html = await self._fetch_page(url, pages)
+            details = await run_in_process(extract_page_details, html, content)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            details = {
                 'phone': None,
-                'date': "Check website for dates",
-                'stall_info': "Contact organizer for vendor registration details"
+                'date': DEFAULT_DATE,
+                'location': extract_location(content),
+                'stall_info': "Contact organizer for vendor registration details",
             }
+        return {'name': title, 'description': description, **details}
 
-    def _extract_date_from_text(self, text: str) -> str:
-        """Extract date from text with additional patterns."""
-        date_patterns = [
-            r'\b(?:January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}',
-            r'\b\d{1,2}/\d{1,2}/\d{4}',
-            r'\b\d{1,2}-\d{1,2}-\d{4}',
-            r'\b\d{4}-\d{2}-\d{2}'  # ISO date format
-        ]
-        for pattern in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(0)
-        return "Check website for dates"
-
-    def _extract_location_from_content(self, content: str, full_text: str = "") -> str:
-        """Extract location from content with refined patterns."""
-        text = content + " " + full_text
-        location_patterns = [
-            r'\b\d+\s+[\w\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Circle|Cir)\b',
-            r'\b[\w\s]+,\s*[A-Z]{2}\s*\d{5}\b',
-            r'\b[\w\s]+,\s*(?:Mumbai|Delhi|Bangalore|Chennai|Kolkata|Pune|Hyderabad|Ahmedabad|Jaipur|Lucknow)\b',
-            r'\b(?:Mumbai|Delhi|Bangalore|Chennai|Kolkata|Pune|Hyderabad|Ahmedabad|Jaipur|Lucknow)\b'
-        ]
-        for pattern in location_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(0)
-        return "Location details on website"
-
-    def _extract_stall_info(self, full_text: str, content: str) -> str:
-        """Extract stall/vendor information with more specific conditions."""
-        text = (full_text + " " + content).lower()
-        if 'vendor' in text and 'registration' in text:
-            return "Vendor registration open - apply via website"
-        elif 'stall' in text and 'booking' in text:
-            return "Stall booking required - contact organizer"
-        elif 'food' in text and 'vendor' in text:
-            return "Food vendors welcome - check website for details"
-        elif any(word in text for word in ['₹', 'rs.', 'fee', 'cost']):
-            return "Vendor fees apply - see website for pricing"
-        else:
-            return "Contact event organizer for vendor opportunities"
-
-    def _deduplicate_and_filter_events(self, events: List[EventResponse], vendor: Vendor) -> List[EventResponse]:
+    def _deduplicate_and_filter_events(self, events: List[EventResponse], location: str) -> List[EventResponse]:
         """Remove duplicates and apply location-based filtering."""
         seen_urls = set()
         seen_names = set()
@@ -240,7 +264,7 @@ class EventDiscoveryService:
                     event.event_name.lower() in seen_name.lower() for seen_name in seen_names)):
                 continue
             # Filter events by location proximity
-            if vendor.Location.lower() in event.location.lower() or any(city in event.location.lower() for city in vendor.Location.lower().split(',')):
+            if location.lower() in event.location.lower() or any(city.strip() and city.strip() in event.location.lower() for city in location.lower().split(',')):
                 seen_urls.add(event.source_url)
                 seen_names.add(event.event_name)
                 unique_events.append(event)
@@ -250,124 +274,99 @@ class EventDiscoveryService:
 event_router = APIRouter(prefix="/vendor-events", tags=["vendor-events"])
 
 # Initialize the service with your Tavily API key
-TAVILY_API_KEY = "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"  # Replace with your actual Tavily API key
+TAVILY_API_KEY = settings.TAVILY_API_KEY or "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"  # Set TAVILY_API_KEY in .env to override
 event_service = EventDiscoveryService(TAVILY_API_KEY)
+@event_router.get("/search-cache/stats")
+async def get_search_cache_stats():
+    """Hit/miss counters of the Tavily query cache and the scraped page cache, for sizing them."""
+    fetcher = get_http_fetcher()
+    return {
+        "search": search_cache.snapshot(),
+        "pages": await asyncio.to_thread(fetcher.cache.snapshot) if fetcher.cache else None,
+    }
+
+
+# One discovery per city at a time in this process; concurrent requests wait for it and read its results.
+# city -> [lock, users]; an entry is dropped when its last user leaves, so the map only holds cities in flight.
+_city_locks = {}
+
+
+@asynccontextmanager
+async def city_lock(city: str):
+    entry = _city_locks.setdefault(city, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _city_locks[city]
+
+
 @event_router.get("/events", response_model=List[EventResponse])
 async def get_vendor_events(
+    request: Request,
+    response: Response,
     vendor_id: str,
     radius_km: int = 50,
     max_results: int = 10,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    vendor = db.query(Vendor).filter(Vendor.id == vendor_id).first()
+    """
+    Events for a vendor, served from the city-wide event store. The first request in a city (or
+    the first after EVENT_CITY_REFRESH_SECONDS) runs discovery; every other vendor there reuses it.
+    The city's events are ranked by this vendor's relevance. radius_km is kept for existing clients;
+    the shared run searches EVENT_CITY_RADIUS_KM around the city.
+    """
+    vendor = await db.get(Vendor, int(vendor_id)) if vendor_id.isdigit() else None
     if not vendor:
         raise HTTPException(status_code=404, detail="Vendor not found")
 
-    # First try fetching from the DB
-    db_events = db.query(VendorEvent).filter(
-        VendorEvent.vendor_id == vendor_id
-    ).all()
+    city = city_key(vendor.Location)
+    run = await db.run_sync(get_run, city)
+    if not run_is_fresh(run):
+        async with city_lock(city):
+            # Another request may have finished the run while this one waited for the lock
+            run = await db.run_sync(get_run, city)
+            if not run_is_fresh(run):
+                try:
+                    events = await event_service.find_city_events(
+                        city,
+                        radius_km=settings.EVENT_CITY_RADIUS_KM,
+                        max_results=settings.EVENT_CITY_MAX_EVENTS
+                    )
+                except Exception as e:
+                    # Older events for the city are better than none
+                    if run is None:
+                        raise HTTPException(status_code=500, detail=f"Error finding events: {str(e)}")
+                    print(f"Event discovery for '{city}' failed, serving stored events: {e}")
+                else:
+                    await db.run_sync(store_discovery_run, city, events, vendor.id)
+                    await db.commit()
+
+    if await db.run_sync(link_city_events, vendor.id, city):
+        await db.commit()
+
+    # Events drop out of the list once their day has passed, so the tag changes with the date too
+    today = date.today()
+    unchanged = await db.run_sync(
+        lambda sync_db: not_modified(request, response, sync_db, vendor.id, VENDOR_EVENTS, variant=today.isoformat())
+    )
+    if unchanged:
+        return unchanged
 
-    filtered_events = [
+    stored = rank_for_vendor(await db.run_sync(vendor_events, vendor.id, today), vendor)[:max_results]
+    return [
         EventResponse(
             event_name=e.event_name,
-            description=e.description,
-            location=e.location,
+            description=e.description or "",
+            location=e.location or "",
             contact_phone=e.contact_phone,
-            stall_info=e.stall_info,
+            stall_info=e.stall_info or "",
             event_date=e.event_date,
             source_url=e.source_url,
             created_at=e.created_at,
         )
-        for e in db_events if vendor.Location.lower() in e.location.lower() 
-        or vendor.BusinessInfo.lower() in e.description.lower()
-    ]
-
-    if filtered_events:
-        return filtered_events[:max_results]
-
-    # If not found, call Tavily
-    try:
-        events = await event_service.find_vendor_events(
-            vendor=vendor,
-            radius_km=radius_km,
-            max_results=max_results
-        )
-
-        # Save new events to DB
-        for event in events:
-            if not db.query(VendorEvent).filter_by(source_url=event.source_url).first():
-                new_event = VendorEvent(
-                    vendor_id=vendor_id,
-                    event_name=event.event_name,
-                    description=event.description,
-                    location=event.location,
-                    contact_phone=event.contact_phone,
-                    stall_info=event.stall_info,
-                    event_date=event.event_date,
-                    source_url=event.source_url
-                )
-                db.add(new_event)
-        db.commit()
-
-        return events
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error finding events: {str(e)}")
-
-
-
-@event_router.get(
-    "/events",
-    response_model=List[VendorEventRead],          # or List[EventResponse] if you prefer
-)
-async def get_vendor_events(
-    vendor_id: str,
-    radius_km: int = 50,
-    max_results: int = 10,
-    db: Session = Depends(get_db),
-):
-    vendor = db.query(Vendor).filter(Vendor.id == vendor_id).first()
-    if not vendor:
-        raise HTTPException(404, "Vendor not found")
-
-    # 1️⃣ Try local cache first
-    db_events = (
-        db.query(VendorEvent)
-          .filter(VendorEvent.vendor_id == vendor_id)
-          .all()
-    )
-
-    # optional filtering logic
-    filtered = [
-        e for e in db_events
-        if vendor.Location.lower() in e.location.lower()
-           or vendor.BusinessInfo.lower() in e.description.lower()
+        for e in stored
     ]
-    if filtered:
-        return filtered[:max_results]
-
-    # 2️⃣ Fallback to Tavily
-    events = await event_service.find_vendor_events(vendor, radius_km, max_results)
-
-    # 3️⃣ Persist any brand‑new events
-    for ev in events:
-        exists = (
-            db.query(VendorEvent)
-              .filter_by(source_url=ev.source_url)
-              .first()
-        )
-        if not exists:
-            db_event = VendorEvent(
-                vendor_id=vendor_id,
-                event_name=ev.event_name,
-                description=ev.description,
-                location=ev.location,
-                contact_phone=ev.contact_phone,
-                stall_info=ev.stall_info,
-                event_date=ev.event_date,
-                source_url=ev.source_url,
-            )
-            db.add(db_event)
-    db.commit()
-
-    return events
@@ -0,0 +1,36 @@
+from typing import List
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from core.auth import VendorSnapshot, get_current_vendor
+from db.database import get_db, get_read_db
+from db.inventory import list_inventory, rebuild_inventory
+from schemas.inventory import InventoryItemResponse
+
+router = APIRouter()
+
+# -------------------------------
+# INVENTORY Endpoints
+# prefix: /inventory
+# -------------------------------
+inventory_router = APIRouter(prefix="/inventory", tags=["Inventory"])
+
+@inventory_router.get("/", response_model=List[InventoryItemResponse])
+def get_inventory(
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_read_db)
+):
+    # One row per item, maintained alongside every purchase/sale write
+    return list_inventory(db, vendor.id)
+
+@inventory_router.post("/rebuild", response_model=List[InventoryItemResponse])
+def rebuild_vendor_inventory(
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_db)
+):
+    """Recompute the balances from the full purchase and sales history (backfill for existing data)."""
+    items = rebuild_inventory(db, vendor.id)
+    db.commit()
+    return items
+
+router.include_router(inventory_router)
@@ -0,0 +1,126 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from typing import Iterator, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from core.auth import VendorSnapshot, get_current_vendor
+from core.pagination import day_bounds
+from db.database import ReadSessionLocal
+from db.ledger import LEDGER_MODELS
+
+router = APIRouter()
+
+# -------------------------------
+# LEDGER EXPORT Endpoints
+# prefix: /exports
+# -------------------------------
+export_router = APIRouter(prefix="/exports", tags=["Exports"])
+
+# URL name -> (ledger kind, timestamp column)
+EXPORTS = {
+    'purchases': ('purchase', 'created_at'),
+    'sales': ('selling', 'date'),
+}
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+FETCH_SIZE = 1000           # rows per server-side cursor fetch
+FLUSH_BYTES = 64 * 1024     # response chunk size
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return getattr(value, "value", value)  # enums
+
+def export_rows(kind: str, ts_field: str, vendor_id: int, start: Optional[date], end: Optional[date]) -> Iterator[tuple]:
+    """
+    Yield the column names, then each ledger row as a tuple, oldest first. Rows come off a
+    server-side cursor FETCH_SIZE at a time, so memory does not grow with the export.
+    The generator owns its session: request-scoped ones are closed before the body streams.
+    """
+    model = LEDGER_MODELS[kind]
+    columns = [c for c in model.__table__.columns if c.key != 'vendor_id']
+    ts_col = model.__table__.c[ts_field]
+    stmt = (
+        select(*columns)
+        .where(model.vendor_id == vendor_id, *day_bounds(ts_col, start, end))
+        .order_by(ts_col, model.id)
+        .execution_options(yield_per=FETCH_SIZE)
+    )
+    db = ReadSessionLocal()
+    try:
+        yield tuple(c.key for c in columns)
+        for row in db.execute(stmt):
+            yield tuple(_plain(value) for value in row)
+    finally:
+        db.close()
+
+def encode_csv(rows: Iterator[tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= FLUSH_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+def encode_ndjson(rows: Iterator[tuple]) -> Iterator[bytes]:
+    header = next(rows)
+    chunk = []
+    size = 0
+    for row in rows:
+        line = json.dumps(dict(zip(header, row)), separators=(",", ":")) + "\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= FLUSH_BYTES:
+            yield "".join(chunk).encode()
+            chunk, size = [], 0
+    yield "".join(chunk).encode()
+
+def gzipped(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+@export_router.get("/{ledger}")
+def export_ledger(
+    ledger: str,
+    format: str = Query('csv', description='"csv" or "ndjson"'),
+    gzip: bool = Query(False, description="Send a .gz file"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+):
+    """Stream a vendor's full purchase or sales history (optionally a day range) as CSV or NDJSON."""
+    if ledger not in EXPORTS:
+        raise HTTPException(status_code=404, detail='Unknown ledger. Must be "purchases" or "sales".')
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail='Invalid format. Must be "csv" or "ndjson".')
+
+    kind, ts_field = EXPORTS[ledger]
+    rows = export_rows(kind, ts_field, vendor.id, start, end)
+    body = encode_csv(rows) if format == 'csv' else encode_ndjson(rows)
+    filename = f"{ledger}-{start or 'all'}-{end or date.today()}.{format}"
+    media_type = FORMATS[format]
+    if gzip:
+        body = gzipped(body)
+        filename += ".gz"
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "Cache-Control": "no-store"},
+    )
+
+router.include_router(export_router)
@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+import tempfile
+from typing import Iterator, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+
+from core.auth import VendorSnapshot, get_current_vendor
+from core.config import settings
+from core.ledger_import import LEDGERS, import_ledger_csv
+from db.database import get_db
+
+router = APIRouter()
+
+# -------------------------------
+# LEDGER IMPORT Endpoints
+# prefix: /imports
+# -------------------------------
+import_router = APIRouter(prefix="/imports", tags=["Imports"])
+
+REJECTS_SPOOL_BYTES = 1024 * 1024  # reject reports larger than this spill to a temp file
+READ_BYTES = 64 * 1024
+
+def _read_and_close(report) -> Iterator[bytes]:
+    try:
+        report.seek(0)
+        while True:
+            data = report.read(READ_BYTES)
+            if not data:
+                break
+            yield data.encode()
+    finally:
+        report.close()
+
+@import_router.post("/{ledger}")
+def import_ledger(
+    ledger: str,
+    file: UploadFile = File(...),
+    chunk_size: Optional[int] = Query(None, ge=1, le=10000, description=f"Rows per insert (default {settings.LEDGER_IMPORT_CHUNK_SIZE})"),
+    rejects: bool = Query(False, description="Answer with a CSV of every rejected row; the summary moves to X-Import-Summary"),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_db),
+):
+    """
+    Import historical purchases or sales from a CSV with the columns of the create endpoints
+    (item_name, quantity, price | total_price, payment_method) and an optional date column.
+    The file is parsed as it is read; the response is a throughput summary with the first rejected
+    lines, or with ?rejects=true a CSV of all of them. If a chunk cannot be written the import stops
+    and answers 207 with the partial summary: rows through committed_through_line are in the ledger.
+    """
+    if ledger not in LEDGERS:
+        raise HTTPException(status_code=404, detail='Unknown ledger. Must be "purchases" or "sales".')
+    # Sync endpoint, so the parse and the inserts run on the threadpool, not the event loop
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    report = tempfile.SpooledTemporaryFile(REJECTS_SPOOL_BYTES, mode="w+", newline="", encoding="utf-8") if rejects else None
+    try:
+        summary = import_ledger_csv(db, ledger, stream, vendor.id, chunk_size, report)
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Only the header can get here; unreadable rows further down end the import with a partial summary
+        if report is not None:
+            report.close()
+        detail = "CSV must be UTF-8 encoded" if isinstance(e, UnicodeDecodeError) else f"Unreadable CSV header: {e}"
+        raise HTTPException(status_code=400, detail=detail)
+    finally:
+        stream.detach()
+
+    status_code = 200 if summary.complete else 207
+    if report is None:
+        return JSONResponse(summary.as_dict(), status_code=status_code)
+    result = summary.as_dict()
+    del result["rejects"], result["rejects_truncated"]
+    return StreamingResponse(
+        _read_and_close(report),
+        status_code=status_code,
+        media_type="text/csv; charset=utf-8",
+        headers={
+            "Content-Disposition": f'attachment; filename="{ledger}-rejects.csv"',
+            "X-Import-Summary": json.dumps(result, separators=(",", ":")),
+        },
+    )
+
+router.include_router(import_router)
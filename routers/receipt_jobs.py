@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import uuid
+from typing import Optional
+
+import redis.asyncio as aioredis
+from celery.result import AsyncResult
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+
+from core.auth import VendorSnapshot, get_current_vendor
+from core.cache import TieredCache, redis_cache_url
+from core.celery import celery_app, process_receipt_job
+from core.config import settings
+from core.ingest import ingest_upload, stage_image
+from core.receipts import INTENTS, ReceiptError
+from core.sse import event_stream, sse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+# -------------------------------
+# RECEIPT JOBS Endpoints
+# prefix: /receipt-jobs
+# -------------------------------
+receipt_job_router = APIRouter(prefix="/receipt-jobs", tags=["Receipt Jobs"])
+
+# job_id -> vendor_id, so a vendor can only see their own jobs (including ones still queued)
+job_owners = TieredCache(
+    namespace="receipt-job",
+    ttl_seconds=settings.RECEIPT_JOB_TTL_SECONDS,
+    max_entries=10000,
+    redis_url=redis_cache_url(),
+)
+
+# Where uploads wait for the worker (core.ingest.stage_image); same Redis as the caches
+_image_store: Optional[aioredis.Redis] = None
+
+
+def _image_store_client() -> aioredis.Redis:
+    global _image_store
+    if _image_store is None:
+        url = redis_cache_url()
+        if not url:
+            raise HTTPException(status_code=503, detail="Receipt jobs need Redis (CACHE_REDIS_URL or a Redis CELERY_BROKER_URL).")
+        _image_store = aioredis.from_url(url)
+    return _image_store
+
+
+async def _job_status(job_id: str) -> dict:
+    # AsyncResult talks to the result backend synchronously, so keep it off the event loop
+    def read():
+        result = AsyncResult(job_id, app=celery_app)
+        return result.state, result.info
+
+    state, info = await asyncio.to_thread(read)
+    if state == "PENDING":
+        return {"job_id": job_id, "status": "queued"}
+    if state in ("STARTED", "PROGRESS", "RETRY"):
+        stage = info.get("stage") if isinstance(info, dict) else None
+        return {"job_id": job_id, "status": "processing", "stage": stage}
+    if state == "SUCCESS" and isinstance(info, dict):
+        return {"job_id": job_id, **info}
+    return {"job_id": job_id, "status": "failed", "status_code": 500, "error": str(info)}
+
+
+async def _owned_job(job_id: str, vendor: VendorSnapshot) -> None:
+    if await job_owners.get(job_id) != vendor.id:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+
+@receipt_job_router.post("/", status_code=status.HTTP_202_ACCEPTED)
+async def create_receipt_job(
+    file: UploadFile = File(...),
+    intent: str = Form(...),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+):
+    """
+    Queue a receipt for extraction on the Celery workers and return immediately.
+    Follow the job with GET /receipt-jobs/{job_id} or the SSE stream at /receipt-jobs/{job_id}/events.
+    """
+    if intent not in INTENTS:
+        raise HTTPException(status_code=400, detail='Invalid intent. Must be "purchase" or "selling".')
+    try:
+        image = await ingest_upload(file)
+    except ReceiptError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    try:
+        staged = await stage_image(_image_store_client(), image)
+    except aioredis.RedisError as e:
+        logger.warning(f"Could not stage receipt image for a job: {e}")
+        raise HTTPException(status_code=503, detail="Could not queue the receipt. Please try again.")
+    del image
+
+    job_id = str(uuid.uuid4())
+    await job_owners.set(job_id, vendor.id)
+    await asyncio.to_thread(
+        process_receipt_job.apply_async,
+        (vendor.id, intent, staged),
+        task_id=job_id,
+    )
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"{settings.API_PREFIX}/receipt-jobs/{job_id}",
+        "events_url": f"{settings.API_PREFIX}/receipt-jobs/{job_id}/events",
+    }
+
+
+@receipt_job_router.get("/{job_id}")
+async def get_receipt_job(job_id: str, vendor: VendorSnapshot = Depends(get_current_vendor)):
+    await _owned_job(job_id, vendor)
+    return await _job_status(job_id)
+
+
+@receipt_job_router.get("/{job_id}/events")
+async def stream_receipt_job(job_id: str, vendor: VendorSnapshot = Depends(get_current_vendor)):
+    """Server-sent events: a `status` event whenever the job changes, then `done` or `failed`."""
+    await _owned_job(job_id, vendor)
+
+    async def events():
+        last = None
+        deadline = asyncio.get_running_loop().time() + settings.RECEIPT_JOB_STREAM_SECONDS
+        while True:
+            job = await _job_status(job_id)
+            if job["status"] in ("done", "failed"):
+                yield sse(job["status"], job)
+                return
+            if job != last:
+                yield sse("status", job)
+                last = job
+            if asyncio.get_running_loop().time() > deadline:
+                yield sse("timeout", job)
+                return
+            await asyncio.sleep(settings.RECEIPT_JOB_POLL_SECONDS)
+
+    return event_stream(events())
+
+
+router.include_router(receipt_job_router)
@@ -1,15 +1,15 @@
 
-import uuid
-from typing import List, Optional
+from typing import List
 from fastapi import (
     APIRouter, Depends, HTTPException,
-    Cookie, Response, BackgroundTasks, status
+    Request, Response, BackgroundTasks, status
 )
 from sqlalchemy.orm import Session
 from datetime import datetime
-from models.vendor import Vendor
+from core.auth import VendorSnapshot, get_current_vendor
+from core.etag import REMINDERS, bump_version, not_modified
 
-from db.database import get_db
+from db.database import get_db, get_read_db
 
 from models.remainder import Remind_Me
 from schemas.remainder import RemindCreate, RemindResponse
@@ -22,21 +22,8 @@ router = APIRouter()
 reminder_router = APIRouter(prefix="/reminders", tags=["Reminders"])
 
 
-def get_session_id(session_id: Optional[str] = Cookie(None)):
-    return session_id
-
-
-def get_current_vendor(session_id: str = Depends(get_session_id), db: Session = Depends(get_db)):
-    if not session_id:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    vendor = db.query(Vendor).filter(Vendor.session_id == session_id).first()
-    if not vendor:
-        raise HTTPException(status_code=401, detail="Vendor not found")
-    return vendor
-
-
 @reminder_router.post("/", response_model=RemindResponse, status_code=status.HTTP_201_CREATED)
-def create_reminder(request: RemindCreate, vendor: Vendor = Depends(get_current_vendor), db: Session = Depends(get_db)):
+def create_reminder(request: RemindCreate, vendor: VendorSnapshot = Depends(get_current_vendor), db: Session = Depends(get_db)):
     reminder = Remind_Me(
         Date_Time=request.Date_Time,
         item_name=request.item_name,
@@ -48,18 +35,22 @@ def create_reminder(request: RemindCreate, vendor: Vendor = Depends(get_current_
         vendor_id=vendor.id
     )
     db.add(reminder)
+    bump_version(db, [vendor.id], REMINDERS)
     db.commit()
     db.refresh(reminder)
     return reminder
 
 
 @reminder_router.get("/", response_model=List[RemindResponse])
-def list_reminders(vendor: Vendor = Depends(get_current_vendor), db: Session = Depends(get_db)):
+def list_reminders(request: Request, response: Response, vendor: VendorSnapshot = Depends(get_current_vendor), db: Session = Depends(get_read_db)):
+    unchanged = not_modified(request, response, db, vendor.id, REMINDERS)
+    if unchanged:
+        return unchanged
     return db.query(Remind_Me).filter(Remind_Me.vendor_id == vendor.id).order_by(Remind_Me.Date_Time.asc()).all()
 
 
 @reminder_router.get("/{reminder_id}", response_model=RemindResponse)
-def get_reminder(reminder_id: int, vendor: Vendor = Depends(get_current_vendor), db: Session = Depends(get_db)):
+def get_reminder(reminder_id: int, vendor: VendorSnapshot = Depends(get_current_vendor), db: Session = Depends(get_read_db)):
     r = db.query(Remind_Me).filter(Remind_Me.id == reminder_id, Remind_Me.vendor_id == vendor.id).first()
     if not r:
         raise HTTPException(status_code=404, detail="Reminder not found")
@@ -67,7 +58,7 @@ def get_reminder(reminder_id: int, vendor: Vendor = Depends(get_current_vendor),
 
 
 @reminder_router.put("/{reminder_id}", response_model=RemindResponse)
-def update_reminder(reminder_id: int, request: RemindCreate, vendor: Vendor = Depends(get_current_vendor), db: Session = Depends(get_db)):
+def update_reminder(reminder_id: int, request: RemindCreate, vendor: VendorSnapshot = Depends(get_current_vendor), db: Session = Depends(get_db)):
     r = db.query(Remind_Me).filter(Remind_Me.id == reminder_id, Remind_Me.vendor_id == vendor.id).first()
     if not r:
         raise HTTPException(status_code=404, detail="Reminder not found")
@@ -79,17 +70,19 @@ def update_reminder(reminder_id: int, request: RemindCreate, vendor: Vendor = De
     r.phone_number = request.phone_number # type: ignore
     r.supplier_phone_number = request.supplier_phone_number # type: ignore
     r.payment_method = request.payment_method # type: ignore
+    bump_version(db, [vendor.id], REMINDERS)
     db.commit()
     db.refresh(r)
     return r
 
 
 @reminder_router.delete("/{reminder_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_reminder(reminder_id: int, vendor: Vendor = Depends(get_current_vendor), db: Session = Depends(get_db)):
+def delete_reminder(reminder_id: int, vendor: VendorSnapshot = Depends(get_current_vendor), db: Session = Depends(get_db)):
     r = db.query(Remind_Me).filter(Remind_Me.id == reminder_id, Remind_Me.vendor_id == vendor.id).first()
     if not r:
         raise HTTPException(status_code=404, detail="Reminder not found")
     db.delete(r)
+    bump_version(db, [vendor.id], REMINDERS)
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
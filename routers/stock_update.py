@@ -1,33 +1,59 @@
-import uuid
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from fastapi import (
-    APIRouter, Depends, HTTPException,
-    Cookie, Response, BackgroundTasks, status
+    APIRouter, Body, Depends, HTTPException,
+    Query, Request, Response, BackgroundTasks, status
 )
+from pydantic import BaseModel, ValidationError
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date, datetime
 
-from db.database import get_db
+from core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, keyset_page
+from db.database import get_db, get_read_db
+from core.config import settings
+from core.etag import PURCHASES, SALES, not_modified
+from db.ledger import apply_ledger_aggregates, insert_ledger_rows
 from models.stock_update import SellingTable, PurchaseTable
-from models.vendor import Vendor  # Import Vendor model
+from core.auth import VendorSnapshot, get_current_vendor, get_session_id
 from schemas.stock_update import (
     PurchaseCreate, PurchaseResponse,
-    SellingCreate, SellingResponse
+    SellingCreate, SellingResponse,
+    PurchaseBulkResponse, SellingBulkResponse
 )
 
 router = APIRouter()
 
-# -- Helper for session cookie and vendor --
-def get_session_id(session_id: Optional[str] = Cookie(None)):
-    if not session_id:
-        session_id = str(uuid.uuid4())
-    return session_id
-
-async def get_current_vendor(session_id: str = Depends(get_session_id), db: Session = Depends(get_db)):
-    vendor = db.query(Vendor).filter(Vendor.session_id == session_id).first()
-    if not vendor:
-        raise HTTPException(status_code=401, detail="Vendor not authenticated")
-    return vendor
+# -- Helper for the bulk endpoints --
+def bulk_create(kind: str, schema: type[BaseModel], rows: List[Dict[str, Any]], atomic: bool, vendor_id: int, db: Session) -> dict:
+    """
+    Validate every row with `schema` and insert the valid ones with one INSERT ... RETURNING in a
+    single transaction. Invalid rows are reported by index; with atomic=True any invalid row
+    rejects the whole batch instead.
+    """
+    if len(rows) > settings.LEDGER_BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.LEDGER_BULK_MAX_ROWS} rows per request")
+
+    valid, errors = [], []
+    for idx, row in enumerate(rows):
+        try:
+            item = schema.model_validate(row)
+        except ValidationError as e:
+            errors.append({
+                "index": idx,
+                "errors": [{"field": ".".join(str(loc) for loc in err["loc"]), "message": err["msg"]} for err in e.errors()],
+            })
+            continue
+        valid.append({**item.model_dump(), "vendor_id": vendor_id})
+
+    if errors and atomic:
+        raise HTTPException(status_code=422, detail={"message": "No rows were saved", "errors": errors})
+
+    try:
+        records = insert_ledger_rows(db, kind, valid)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    return {"created": records, "errors": errors}
 
 # -------------------------------
 # PURCHASE (Stock In) Endpoints
@@ -41,7 +67,7 @@ def create_purchase(
     background_tasks: BackgroundTasks,
     response: Response,
     session_id: str = Depends(get_session_id),
-    vendor: Vendor = Depends(get_current_vendor),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
     db: Session = Depends(get_db),
 ):
     # Set session cookie
@@ -50,23 +76,49 @@ def create_purchase(
     # Associate purchase with the current vendor
     purchase = PurchaseTable(**request.dict(), vendor_id=vendor.id)
     db.add(purchase)
+    apply_ledger_aggregates(db, 'purchase', [purchase])
     db.commit()
     db.refresh(purchase)
     return purchase
 
+@purchase_router.post("/bulk", response_model=PurchaseBulkResponse, status_code=status.HTTP_201_CREATED)
+def create_purchases_bulk(
+    rows: List[Dict[str, Any]] = Body(...),
+    atomic: bool = Query(False, description="Reject the whole batch if any row is invalid"),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_db),
+):
+    return bulk_create('purchase', PurchaseCreate, rows, atomic, vendor.id, db)
+
 @purchase_router.get("/", response_model=List[PurchaseResponse])
 def list_purchases(
-    vendor: Vendor = Depends(get_current_vendor),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_read_db)
 ):
-    # Filter purchases by vendor_id
-    return db.query(PurchaseTable).filter(PurchaseTable.vendor_id == vendor.id).order_by(PurchaseTable.created_at.desc()).all()
+    unchanged = not_modified(request, response, db, vendor.id, PURCHASES)
+    if unchanged:
+        return unchanged
+    # Newest first, one page at a time; the next page's cursor is returned in X-Next-Cursor
+    purchases, next_cursor = keyset_page(
+        db.query(PurchaseTable).filter(PurchaseTable.vendor_id == vendor.id),
+        PurchaseTable.created_at, PurchaseTable.id,
+        limit=limit, cursor=cursor, start=start, end=end,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return purchases
 
 @purchase_router.get("/{purchase_id}", response_model=PurchaseResponse)
 def get_purchase(
     purchase_id: int,
-    vendor: Vendor = Depends(get_current_vendor),
-    db: Session = Depends(get_db)
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_read_db)
 ):
     purchase = db.get(PurchaseTable, purchase_id)
     if not purchase or purchase.vendor_id != vendor.id:
@@ -77,14 +129,17 @@ def get_purchase(
 def update_purchase(
     purchase_id: int,
     request: PurchaseCreate,
-    vendor: Vendor = Depends(get_current_vendor),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
     db: Session = Depends(get_db),
 ):
     purchase = db.get(PurchaseTable, purchase_id)
     if not purchase or purchase.vendor_id != vendor.id:
         raise HTTPException(status_code=404, detail="Purchase not found or not authorized")
+    # Take the old line out of the aggregates and put the edited one in
+    apply_ledger_aggregates(db, 'purchase', [purchase], sign=-1)
     for field, value in request.dict().items():
         setattr(purchase, field, value)
+    apply_ledger_aggregates(db, 'purchase', [purchase])
     db.commit()
     db.refresh(purchase)
     return purchase
@@ -92,12 +147,13 @@ def update_purchase(
 @purchase_router.delete("/{purchase_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_purchase(
     purchase_id: int,
-    vendor: Vendor = Depends(get_current_vendor),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
     db: Session = Depends(get_db)
 ):
     purchase = db.get(PurchaseTable, purchase_id)
     if not purchase or purchase.vendor_id != vendor.id:
         raise HTTPException(status_code=404, detail="Purchase not found or not authorized")
+    apply_ledger_aggregates(db, 'purchase', [purchase], sign=-1)
     db.delete(purchase)
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -111,29 +167,55 @@ selling_router = APIRouter(prefix="/sales", tags=["Sales"])
 @selling_router.post("/", response_model=SellingResponse, status_code=status.HTTP_201_CREATED)
 def create_sale(
     request: SellingCreate,
-    vendor: Vendor = Depends(get_current_vendor),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
     db: Session = Depends(get_db)
 ):
     # Associate sale with the current vendor
     sale = SellingTable(**request.dict(), vendor_id=vendor.id)
     db.add(sale)
+    apply_ledger_aggregates(db, 'selling', [sale])
     db.commit()
     db.refresh(sale)
     return sale
 
+@selling_router.post("/bulk", response_model=SellingBulkResponse, status_code=status.HTTP_201_CREATED)
+def create_sales_bulk(
+    rows: List[Dict[str, Any]] = Body(...),
+    atomic: bool = Query(False, description="Reject the whole batch if any row is invalid"),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_db),
+):
+    return bulk_create('selling', SellingCreate, rows, atomic, vendor.id, db)
+
 @selling_router.get("/", response_model=List[SellingResponse])
 def list_sales(
-    vendor: Vendor = Depends(get_current_vendor),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_read_db)
 ):
-    # Filter sales by vendor_id
-    return db.query(SellingTable).filter(SellingTable.vendor_id == vendor.id).order_by(SellingTable.date.desc()).all()
+    unchanged = not_modified(request, response, db, vendor.id, SALES)
+    if unchanged:
+        return unchanged
+    # Newest first, one page at a time; the next page's cursor is returned in X-Next-Cursor
+    sales, next_cursor = keyset_page(
+        db.query(SellingTable).filter(SellingTable.vendor_id == vendor.id),
+        SellingTable.date, SellingTable.id,
+        limit=limit, cursor=cursor, start=start, end=end,
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return sales
 
 @selling_router.get("/{sale_id}", response_model=SellingResponse)
 def get_sale(
     sale_id: int,
-    vendor: Vendor = Depends(get_current_vendor),
-    db: Session = Depends(get_db)
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: Session = Depends(get_read_db)
 ):
     sale = db.get(SellingTable, sale_id)
     if not sale or sale.vendor_id != vendor.id:
@@ -144,14 +226,17 @@ def get_sale(
 def update_sale(
     sale_id: int,
     request: SellingCreate,
-    vendor: Vendor = Depends(get_current_vendor),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
     db: Session = Depends(get_db)
 ):
     sale = db.get(SellingTable, sale_id)
     if not sale or sale.vendor_id != vendor.id:
         raise HTTPException(status_code=404, detail="Sale not found or not authorized")
+    # Take the old line out of the aggregates and put the edited one in
+    apply_ledger_aggregates(db, 'selling', [sale], sign=-1)
     for field, value in request.dict().items():
         setattr(sale, field, value)
+    apply_ledger_aggregates(db, 'selling', [sale])
     db.commit()
     db.refresh(sale)
     return sale
@@ -159,12 +244,13 @@ def update_sale(
 @selling_router.delete("/{sale_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_sale(
     sale_id: int,
-    vendor: Vendor = Depends(get_current_vendor),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
     db: Session = Depends(get_db)
 ):
     sale = db.get(SellingTable, sale_id)
     if not sale or sale.vendor_id != vendor.id:
         raise HTTPException(status_code=404, detail="Sale not found or not authorized")
+    apply_ledger_aggregates(db, 'selling', [sale], sign=-1)
     db.delete(sale)
     db.commit()
     return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -3,7 +3,9 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Path, Form, Response, status
 from sqlalchemy.orm import Session
 
-from db.database import get_db
+from core.auth import invalidate_vendor
+from core.etag import VENDOR_EVENTS, bump_version
+from db.database import get_db, get_read_db
 from models.vendor import Vendor
 from schemas.vendor import VendorCreate, VendorOut
 
@@ -24,8 +26,11 @@ def update_vendor(
     for field, value in update_data.items():
         setattr(db_vendor, field, value)
 
+    # Stored events are filtered by the vendor's location and business info
+    bump_version(db, [db_vendor.id], VENDOR_EVENTS)
     db.commit()
     db.refresh(db_vendor)
+    invalidate_vendor(db_vendor.id)
     return db_vendor
 
 @vendor_router.post("/", response_model=VendorOut, status_code=status.HTTP_201_CREATED)
@@ -49,7 +54,7 @@ def create_vendors(
     return new_vendor
 
 @vendor_router.get("/", response_model=List[VendorOut])
-def get_vendors(db: Session = Depends(get_db)):
+def get_vendors(db: Session = Depends(get_read_db)):
     return db.query(Vendor).all()
 
 @vendor_router.post("/authenticate", status_code=status.HTTP_200_OK)
@@ -66,6 +71,8 @@ def authenticate_vendor(
         vendor.session_id = session_id
         db.commit()
         db.refresh(vendor)
+        # The previous session_id no longer identifies this vendor
+        invalidate_vendor(vendor.id)
         # Set session_id cookie
         response.set_cookie(key="session_id", value=session_id, httponly=True)
         return {"exists": True, "vendor": VendorOut.from_orm(vendor).dict()}
@@ -73,7 +80,7 @@ def authenticate_vendor(
         return {"exists": False}
 
 @vendor_router.get("/by-phone/{phone_number}", response_model=VendorOut)
-def get_vendor_by_phone(phone_number: str, db: Session = Depends(get_db)):
+def get_vendor_by_phone(phone_number: str, db: Session = Depends(get_read_db)):
     vendor = db.query(Vendor).filter(Vendor.PhoneNumber == phone_number).first()
     if not vendor:
         raise HTTPException(status_code=404, detail="Vendor not found")
@@ -1,16 +1,18 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Response, Cookie
+from fastapi import APIRouter, HTTPException, status, Depends, Request, Response
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
-import uuid
-from db.database import get_db
+from typing import List
+from db.database import get_async_db
 from core.config import settings
 from models.remainder import Remind_Me
-from models.vendor import Vendor
+from core.auth import VendorSnapshot, get_current_vendor
+from core.etag import REMINDERS, bump_version, not_modified
 from schemas.remainder import RemindCreate, RemindResponse, ModeEnum
 from core.celery import send_whatsapp_reminder
 from datetime import datetime
+import asyncio
 import pytz
 import logging
 
@@ -19,19 +21,6 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-def get_session_id(session_id: Optional[str] = Cookie(None)):
-    if not session_id:
-        session_id = str(uuid.uuid4())
-    return session_id
-
-async def get_current_vendor(session_id: str = Depends(get_session_id), db: Session = Depends(get_db)):
-    logger.debug(f"Checking session_id: {session_id}")
-    vendor = db.query(Vendor).filter(Vendor.session_id == session_id).first()
-    if not vendor:
-        logger.error(f"No vendor found for session_id: {session_id}")
-        raise HTTPException(status_code=401, detail="Vendor not authenticated")
-    logger.debug(f"Found vendor: {vendor.Name}, ID: {vendor.id}, PhoneNumber: {vendor.PhoneNumber}")
-    return vendor
 @router.post(
     "/schedule-payment-reminder",
     response_model=RemindResponse,
@@ -39,8 +28,8 @@ async def get_current_vendor(session_id: str = Depends(get_session_id), db: Sess
 )
 async def schedule_payment(
     remind: RemindCreate,
-    vendor: Vendor = Depends(get_current_vendor),
-    db: Session = Depends(get_db),
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: AsyncSession = Depends(get_async_db),
 ):
     # 1) Localize the picked datetime as IST
     dt = pytz.timezone(settings.TIMEZONE).localize(remind.Date_Time)
@@ -69,16 +58,19 @@ async def schedule_payment(
     )
     try:
         db.add(record)
-        db.commit()
-        db.refresh(record)
+        await db.run_sync(bump_version, [vendor.id], REMINDERS)
+        await db.commit()
+        await db.refresh(record)
     except Exception:
-        db.rollback()
+        await db.rollback()
         logger.exception("DB error saving reminder")
         raise HTTPException(status_code=500, detail="Failed to save reminder")
 
     # 4) Schedule Celery
     delay = max((dt - datetime.now(pytz.timezone(settings.TIMEZONE))).total_seconds(), 0)
-    send_whatsapp_reminder.apply_async(
+    # Publishing to the broker is blocking network I/O, so keep it off the event loop
+    await asyncio.to_thread(
+        send_whatsapp_reminder.apply_async,
         (full_vendor_phone, record.ToWhom, record.supplier_phone_number,
          record.Amount, record.item_name, record.payment_method, record.id),
         countdown=delay,
@@ -89,12 +81,19 @@ async def schedule_payment(
 
 @router.get("/reminders/", response_model=List[RemindResponse])
 async def list_reminders(
-    vendor: Vendor = Depends(get_current_vendor),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    vendor: VendorSnapshot = Depends(get_current_vendor),
+    db: AsyncSession = Depends(get_async_db)
 ):
+    unchanged = await db.run_sync(lambda sync_db: not_modified(request, response, sync_db, vendor.id, REMINDERS))
+    if unchanged:
+        return unchanged
     try:
         logger.debug(f"Fetching reminders for vendor: {vendor.Name}, ID: {vendor.id}")
-        reminders = db.query(Remind_Me).filter(Remind_Me.vendor_id == vendor.id).order_by(Remind_Me.Date_Time.desc()).all()
+        reminders = (await db.scalars(
+            select(Remind_Me).where(Remind_Me.vendor_id == vendor.id).order_by(Remind_Me.Date_Time.desc())
+        )).all()
         logger.debug(f"Found {len(reminders)} reminders")
         return [RemindResponse.from_orm(reminder) for reminder in reminders]
     except Exception as e:
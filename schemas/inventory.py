@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class InventoryItemResponse(BaseModel):
+    item_name: str
+    qty_in: int
+    qty_out: int
+    on_hand: int
+    spend: float
+    revenue: float
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
+from typing import List
 import enum
 
 class ModeEnum(str, enum.Enum):
@@ -44,6 +45,20 @@ class SellingResponse(SellingBase):
     class Config:
         from_attributes = True
 
+# -------------------- Bulk Schemas --------------------
+
+class BulkRowError(BaseModel):
+    index: int  # position of the row in the request array
+    errors: List[dict]
+
+class PurchaseBulkResponse(BaseModel):
+    created: List[PurchaseResponse]
+    errors: List[BulkRowError]
+
+class SellingBulkResponse(BaseModel):
+    created: List[SellingResponse]
+    errors: List[BulkRowError]
+
 # from pydantic import BaseModel
 # from datetime import datetime
 # import enum
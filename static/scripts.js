@@ -99,6 +99,39 @@ function displayReminders(reminders) {
     `).join('');
 }
 
+// The list endpoints return one page, newest first, with the next page's cursor in X-Next-Cursor
+const STOCK_PAGE_SIZE = 100;
+let stockPages = { purchase: { items: [], cursor: null }, sale: { items: [], cursor: null } };
+let stockType = 'all';
+
+async function fetchStockPage(kind, cursor) {
+    const endpoint = kind === 'purchase' ? 'purchases' : 'sales';
+    const params = new URLSearchParams({ limit: STOCK_PAGE_SIZE });
+    if (cursor) params.set('cursor', cursor);
+    const response = await fetch(`${API_BASE}/${endpoint}/?${params}`, { credentials: 'include' });
+    if (response.status === 401) {
+        showAuthModal();
+        return null;
+    }
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+    return { items: await response.json(), cursor: response.headers.get('X-Next-Cursor') };
+}
+
+function stockKinds(type) {
+    return type === 'all' ? ['purchase', 'sale'] : [type];
+}
+
+function renderStockPages() {
+    displayStockData(stockPages.purchase.items, stockPages.sale.items, stockType);
+    if (stockKinds(stockType).some(kind => stockPages[kind].cursor)) {
+        document.getElementById('stockList').insertAdjacentHTML('beforeend', `
+            <div style="text-align: center; margin-top: 1rem;">
+                <button type="button" class="btn btn-secondary" id="stockLoadMore" onclick="loadMoreStock()">Load more</button>
+            </div>
+        `);
+    }
+}
+
 async function loadStockData(type = 'all') {
     if (!currentVendor) {
         showAlert('stockAlert', 'Please log in to view stock data.', 'error');
@@ -107,24 +140,14 @@ async function loadStockData(type = 'all') {
     }
     try {
         showLoading('stockLoading', true);
-        let purchases = [], sales = [];
-        if (type === 'all' || type === 'purchase') {
-            const purchaseResponse = await fetch(`${API_BASE}/purchases/`, { credentials: 'include' });
-            if (purchaseResponse.status === 401) {
-                showAuthModal();
-                return;
-            }
-            purchases = await purchaseResponse.json();
-        }
-        if (type === 'all' || type === 'sale') {
-            const saleResponse = await fetch(`${API_BASE}/sales/`, { credentials: 'include' });
-            if (saleResponse.status === 401) {
-                showAuthModal();
-                return;
-            }
-            sales = await saleResponse.json();
+        stockType = type;
+        stockPages = { purchase: { items: [], cursor: null }, sale: { items: [], cursor: null } };
+        for (const kind of stockKinds(type)) {
+            const page = await fetchStockPage(kind, null);
+            if (!page) return;
+            stockPages[kind] = page;
         }
-        displayStockData(purchases, sales, type);
+        renderStockPages();
     } catch (error) {
         showAlert('stockAlert', 'Error loading stock data: ' + error.message, 'error');
     } finally {
@@ -132,6 +155,23 @@ async function loadStockData(type = 'all') {
     }
 }
 
+async function loadMoreStock() {
+    const button = document.getElementById('stockLoadMore');
+    if (button) button.disabled = true;
+    try {
+        for (const kind of stockKinds(stockType)) {
+            if (!stockPages[kind].cursor) continue;
+            const page = await fetchStockPage(kind, stockPages[kind].cursor);
+            if (!page) return;
+            stockPages[kind] = { items: stockPages[kind].items.concat(page.items), cursor: page.cursor };
+        }
+        renderStockPages();
+    } catch (error) {
+        showAlert('stockAlert', 'Error loading stock data: ' + error.message, 'error');
+        if (button) button.disabled = false;
+    }
+}
+
 function displayStockData(purchases, sales, type = 'all') {
     const container = document.getElementById('stockList');
     let allTransactions = [];